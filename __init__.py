@@ -1,5 +1,7 @@
+from collections import deque
 from datetime import datetime
-from subprocess import Popen, CREATE_NEW_PROCESS_GROUP
+from functools import partial
+from subprocess import Popen
 import io
 import json
 import logging
@@ -8,24 +10,35 @@ import sys
 import time
 
 from flatland import Boolean, Form, Integer, String
-from microdrop.plugin_helpers import (AppDataController, StepOptionsController,
-                                      get_plugin_info, hub_execute)
+from microdrop.plugin_helpers import AppDataController, StepOptionsController
 from microdrop.plugin_manager import (IPlugin, Plugin, PluginGlobals,
                                       ScheduleRequest, emit_signal, implements)
 from microdrop.app_context import (get_app, get_hub_uri, SCREEN_WIDTH,
                                    SCREEN_HEIGHT, SCREEN_TOP, TITLEBAR_HEIGHT)
 from path_helpers import path
 from pygtkhelpers.gthreads import gtk_threadsafe
-from pygtkhelpers.utils import refresh_gui
-from si_prefix import si_format
-import gobject
 import gtk
-import pandas as pd
-import psutil
 
-from ._version import get_versions
-__version__ = get_versions()['version']
-del get_versions
+from .autosave import AutoSaver
+from .background import CoalescedWriter, SerialWorker
+from .corners import CORNERS_KEYS, migrate_corners
+from .memo import LruCache
+from .metadata import get_plugin_metadata
+from .profiles import ProfileStore
+from .process import NEW_PROCESS_GROUP_KWARGS, kill_process_tree
+from .rpc import (UI_STATE_FIELDS, CommandNotSupported, DeviceUiClient,
+                  fingerprint)
+from .settings import (Corners, SurfaceAlphas, VideoConfig, as_pandas,
+                       as_text)
+from .standby import WarmStandbyPool
+from .supervisor import ProcessSupervisor
+from .timeline import StartupTimeline
+from .video_toggle import VideoToggler
+
+# Resolve version from cached plugin metadata, rather than from version control
+# (which may run `git` subprocesses).
+_plugin_metadata = get_plugin_metadata(path(__file__).parent)
+__version__ = getattr(_plugin_metadata, 'version', '0+unknown')
 
 gtk.gdk.threads_init()
 
@@ -36,30 +49,6 @@ logger = logging.getLogger(__name__)
 PluginGlobals.push_env('microdrop.managed')
 
 
-def kill_process_tree(pid, including_parent=True):
-    '''
-    Cross-platform function to kill a parent process and all child processes.
-
-    Based on from `subprocess: deleting child processes in Windows <https://stackoverflow.com/a/4229404/345236>`_
-
-    Parameters
-    ----------
-    pid : int
-        Process ID of parent process.
-    including_parent : bool, optional
-        If ``True``, also kill parent process.
-    '''
-    parent = psutil.Process(pid)
-    children = parent.children(recursive=True)
-    for child in children:
-        child.kill()
-    gone, still_alive = psutil.wait_procs(children, timeout=5)
-    if including_parent:
-        parent.kill()
-        parent.wait(5)
-
-
-
 class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
     """
     This class is automatically registered with the PluginManager.
@@ -68,10 +57,15 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
         Set default window size and position according to **screen size** *and*
         **window titlebar size**.  Also, force default window size if
         ``MICRODROP_FIRST_RUN`` environment variable is set to non-empty value.
+
+    .. versionchanged:: 2.12
+        Add ``warm_standby`` app option to keep a pre-spawned, pre-imported
+        device UI process waiting to replace the running device UI process.
+        Resolve plugin name and version once from cached plugin metadata.
     """
     implements(IPlugin)
-    version = get_plugin_info(path(__file__).parent).version
-    plugin_name = get_plugin_info(path(__file__).parent).plugin_name
+    version = _plugin_metadata.version
+    plugin_name = _plugin_metadata.plugin_name
 
     AppFields = Form.of(
         String.named('video_config').using(default='', optional=True,
@@ -94,7 +88,25 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
                                      properties={'show_in_gui': False}),
         Integer.named('height').using(default=SCREEN_HEIGHT - 1.5 *
                                       TITLEBAR_HEIGHT, optional=True,
-                                      properties={'show_in_gui': False}))
+                                      properties={'show_in_gui': False}),
+        #: .. versionadded:: 2.12
+        Boolean.named('warm_standby').using(default=False, optional=True,
+                                            properties={'title': 'Keep '
+                                                        'warm-standby device '
+                                                        'UI process'}),
+        #: .. versionadded:: 2.12
+        Boolean.named('async_step_video')
+        .using(default=False, optional=True,
+               properties={'title': 'Complete steps without waiting for '
+                           'device UI video toggle'}),
+        #: .. versionadded:: 2.12
+        Integer.named('autosave_interval_s')
+        .using(default=0, optional=True,
+               properties={'title': 'Auto-save device UI settings interval '
+                           '(seconds; 0 to disable)'}),
+        #: .. versionadded:: 2.12
+        String.named('ui_profiles').using(default='', optional=True,
+                                          properties={'show_in_gui': False}))
 
     StepFields = Form.of(Boolean.named('video_enabled')
                          .using(default=True, optional=True,
@@ -102,13 +114,50 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
 
     def __init__(self):
         self.name = self.plugin_name
+        self.ui_client = DeviceUiClient(self.name)
         self.gui_process = None
-        self.gui_heartbeat_id = None
         self._gui_enabled = False
         self.alive_timestamp = None
-
-    def reset_gui(self):
+        # Last known device UI settings in JSON-compatible format.
+        self._last_ui_json_settings = {}
+        # Wait for device UI start up (and other blocking hub requests)
+        # without blocking GTK thread.
+        self.gui_worker = SerialWorker(name='dmf_device_ui_plugin')
+        # Timelines of most recent device UI process start ups.
+        self.startup_timelines = deque(maxlen=20)
+        self._startup_timeline = None
+        self.standby_pool = \
+            WarmStandbyPool(popen_kwargs=NEW_PROCESS_GROUP_KWARGS)
+        self.supervisor = ProcessSupervisor(restart=self._restart_gui,
+                                            kill=self._kill_hung_gui,
+                                            exited=self._on_gui_exit)
+        # Persist settings changed in device UI in the background.
+        self.autosaver = None
+        # `True` once settings have been applied to current device UI process
+        # (i.e., device UI settings may be captured).
+        self._ui_settings_synced = False
+        # Settings models converted from JSON settings, keyed by hash of raw
+        # settings strings.
+        self._settings_cache = LruCache(maxsize=16)
+        # Coalesce app values written in quick succession (e.g., by
+        # `save_ui_settings`) into a single write of changed keys.
+        self._app_values_writer = \
+            CoalescedWriter(self.set_app_values)
+        # Named settings profiles (see `ui_profiles` app value).
+        self.profiles = ProfileStore(self.json_settings_as_python)
+        # Send per-step video toggles without blocking steps (see
+        # `async_step_video` app option).
+        self.video_toggler = \
+            VideoToggler(partial(self.ui_client.execute, timeout_s=5))
+
+    def reset_gui(self, restart=False):
         '''
+        Parameters
+        ----------
+        restart : bool, optional
+            ``True`` if device UI process is being restarted (e.g., after it
+            exited).
+
         .. versionchanged:: 2.2.2
             Use :func:`pygtkhelpers.gthreads.gtk_threadsafe` decorator around
             function to wait for GUI process, rather than using
@@ -118,7 +167,22 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
             Refresh list of registered commands once device UI process has
             started.  The list of registered commands is used to dynamically
             generate items in the device UI context menu.
+
+        .. versionchanged:: 2.12
+            Adopt warm-standby device UI process (if available) instead of
+            spawning a new process.  Spawn a new standby process once the
+            device UI is ready if ``warm_standby`` app option is enabled.
+            Supervise device UI process using :attr:`supervisor` instead of
+            polling process with a 1 Hz ``keep_alive`` timer.  Record timeline
+            of each start up phase (see :meth:`get_startup_timelines`).
+
+            Wait for device UI process, push settings, and refresh commands in
+            background worker thread (rather than in GTK thread).  Return
+            future for start up.
         '''
+        timeline = StartupTimeline('restart' if restart else 'start')
+        self._startup_timeline = timeline
+        self.startup_timelines.append(timeline)
         py_exe = sys.executable
 
         # Set allocation based on saved app values (i.e., remember window size
@@ -130,7 +194,11 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
             for k in ('x', 'y', 'width', 'height'):
                 app_values[k] = default_app_values[k]
 
-        allocation_args = ['-a', json.dumps(app_values)]
+        # Only pass window allocation (e.g., not the `ui_profiles` blob).
+        allocation = dict([(k, app_values[k])
+                           for k in ('x', 'y', 'width', 'height')
+                           if k in app_values])
+        allocation_args = ['-a', json.dumps(allocation)]
 
         app = get_app()
         if app.config.data.get('advanced_ui', False):
@@ -138,45 +206,252 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
         else:
             debug_args = []
 
-        self.gui_process = Popen([py_exe, '-m',
-                                  'dmf_device_ui.bin.device_view', '-n',
-                                  self.name] + allocation_args + debug_args +
-                                 ['fixed', get_hub_uri()],
-                                 creationflags=CREATE_NEW_PROCESS_GROUP)
+        device_ui_args = (['-n', self.name] + allocation_args + debug_args +
+                          ['fixed', get_hub_uri()])
+        self.gui_process = None
+        if app_values.get('warm_standby'):
+            self.gui_process = self.standby_pool.adopt(device_ui_args)
+        if self.gui_process is None:
+            self.gui_process = Popen([py_exe, '-m',
+                                      'dmf_device_ui.bin.device_view'] +
+                                     device_ui_args,
+                                     **NEW_PROCESS_GROUP_KWARGS)
+            timeline.mark('spawned')
+        else:
+            timeline.mark('adopted')
+        gui_process = self.gui_process
+        # Negotiate optional commands with new device UI process.
+        self.ui_client.reset()
+        timeline.pid = gui_process.pid
         self._gui_enabled = True
-
-        def keep_alive():
-            if not self._gui_enabled:
-                self.alive_timestamp = None
-                return False
-            elif self.gui_process.poll() == 0:
-                # GUI process has exited.  Restart.
-                self.cleanup()
-                self.reset_gui()
-                return False
-            else:
-                self.alive_timestamp = datetime.now()
-                # Keep checking.
-                return True
+        self._ui_settings_synced = False
+        # Restart device UI process as soon as it exits.
+        self.supervisor.watch(gui_process)
+        timeline.mark('supervised')
 
         self.step_video_settings = None
 
-        @gtk_threadsafe
-        def _wait_for_gui():
+        def _start_gui():
+            # Wait for device UI process and push settings in background
+            # worker thread, rather than blocking GTK thread.
             self.wait_for_gui_process()
+            timeline.mark('hub_connected')
             # Get current video settings from UI.
             app_values = self.get_app_values()
             # Convert JSON settings to 0MQ plugin API Python types.
             ui_settings = self.json_settings_as_python(app_values)
             self.set_ui_settings(ui_settings, default_corners=True)
-            self.gui_heartbeat_id = gobject.timeout_add(1000, keep_alive)
+            timeline.mark('settings_applied')
             # Refresh list of electrode and route commands.
-            hub_execute('microdrop.command_plugin', 'get_commands')
+            self.ui_client.execute('get_commands',
+                                   target='microdrop.command_plugin')
+            timeline.mark('commands_refreshed')
+            return app_values
+
+        future = self.gui_worker.submit(_start_gui)
+        # Call as thread-safe function, since callback uses GTK.
+        future.add_done_callback(gtk_threadsafe(lambda future:
+                                                self._on_gui_started(
+                                                    gui_process, timeline,
+                                                    future)))
+        return future
+
+    def _on_gui_started(self, gui_process, timeline, future):
+        '''
+        Handle completion of device UI process start up (in GTK thread).
+
+        Ignore start up of a device UI process that is no longer current
+        (e.g., plugin was disabled or app exited during start up).
+
+        .. versionadded:: 2.12
+        '''
+        if not self._gui_enabled or gui_process is not self.gui_process:
+            logger.info('Ignore stale start up of device UI process `%s`.',
+                        gui_process.pid)
+            self._finish_startup_timeline(timeline, 'Start up cancelled.')
+            return
+        exception = future.exception()
+        if exception is not None:
+            logger.error('Error starting device UI process: %s', exception)
+            self._finish_startup_timeline(timeline, str(exception))
+            if 'hub_connected' not in dict(timeline.phases):
+                # Kill process if it is still running; supervisor restarts it.
+                self.supervisor.report_hang(gui_process)
+            return
+        self.supervisor.notify_ready()
+        self._finish_startup_timeline(timeline)
+        self._ui_settings_synced = True
+        self._start_autosave()
+        if future.result().get('warm_standby'):
+            # Replenish standby process once device UI is up, to avoid
+            # slowing down start up of device UI process.
+            self.standby_pool.start()
+
+    def _restart_gui(self):
+        '''
+        Restart device UI process (called by :attr:`supervisor`).
+
+        .. versionadded:: 2.12
+        '''
+        if self._gui_enabled:
+            self.cleanup()
+            self.reset_gui(restart=True)
+
+    def _kill_hung_gui(self, process):
+        '''
+        Kill device UI process tree (e.g., after it stopped responding).
+
+        The device UI process itself is signalled, but not waited on, so it
+        is only reaped (and its exit code recorded) by :attr:`supervisor`.
+
+        .. versionadded:: 2.12
+        '''
+        kill_process_tree(process.pid, including_parent=False, timeout_s=1,
+                          graceful_timeout_s=0)
+        process.kill()
 
-        # Call as thread-safe function, since function uses GTK.
-        _wait_for_gui()
+    def _on_gui_exit(self, process, exit_class):
+        '''
+        Mark device UI as not alive once its process exits.
+
+        .. versionadded:: 2.12
+        '''
+        self.alive_timestamp = None
+        self._ui_settings_synced = False
+
+    def _start_autosave(self):
+        '''
+        Start (or restart) background auto-save of device UI settings,
+        according to ``autosave_interval_s`` app option.
+
+        .. versionadded:: 2.12
+        '''
+        self._stop_autosave()
+        app_values = self.get_app_values()
+        interval_s = app_values.get('autosave_interval_s')
+        if not interval_s or interval_s <= 0:
+            return
+        # Capture settings in auto-save thread, but persist them in GTK
+        # thread.
+        self.autosaver = AutoSaver(self._capture_ui_settings,
+                                   gtk_threadsafe(self.save_ui_settings),
+                                   app_values, UI_STATE_FIELDS,
+                                   interval_s=interval_s)
+        self.autosaver.start()
+
+    def _stop_autosave(self, timeout_s=1):
+        '''
+        Stop background auto-save and persist any pending changes.
+
+        Must be called from the GTK thread.
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximum duration (in seconds) to wait for auto-save thread (e.g.,
+            to finish capturing settings).
+
+        .. versionadded:: 2.12
+        '''
+        autosaver, self.autosaver = self.autosaver, None
+        if autosaver is not None:
+            autosaver.stop(timeout_s=timeout_s)
+            # Persist immediately (e.g., main loop may not run again on exit).
+            autosaver.flush(persist=self.save_ui_settings)
+
+    def _capture_ui_settings(self, field):
+        '''
+        Parameters
+        ----------
+        field : str
+            UI state field to capture (see :data:`.rpc.UI_STATE_FIELDS`).
+
+        Returns
+        -------
+        dict or None
+            Current device UI settings of field in JSON-compatible format, or
+            ``None`` if settings have not been applied to current device UI
+            process, or while a protocol is running (so auto-save requests do
+            not delay step video toggles).
+
+        .. versionadded:: 2.12
+        '''
+        if not self._ui_settings_synced or get_app().running:
+            return None
+        return self.get_ui_json_settings(timeout_s=1, fields=[field])
+
+    def _finish_startup_timeline(self, timeline, error=None):
+        '''
+        Mark start up timeline as finished and write it to the log as JSON.
+
+        .. versionadded:: 2.12
+        '''
+        timeline.finish(error)
+        logger.info('[startup_timeline] %s', json.dumps(timeline.as_dict()))
 
-    def cleanup(self):
+    def _mark_startup(self, phase):
+        '''
+        Record phase of current start up timeline (if start up is ongoing).
+
+        .. versionadded:: 2.12
+        '''
+        if self._startup_timeline is not None:
+            self._startup_timeline.mark(phase)
+
+    def get_startup_timelines(self):
+        '''
+        Returns
+        -------
+        list
+            Timelines of most recent device UI process start ups (oldest
+            first), each in format returned by
+            :meth:`StartupTimeline.as_dict`.
+
+        .. versionadded:: 2.12
+        '''
+        return [timeline.as_dict() for timeline in self.startup_timelines]
+
+    def get_rpc_stats(self):
+        '''
+        Returns
+        -------
+        dict
+            Latency histogram summary, timeout count, and error count of each
+            hub command sent by plugin, keyed by command (see
+            :meth:`.metrics.LatencyHistogram.as_dict`).  Commands sent to
+            plugins other than the device UI are prefixed with the plugin
+            name (e.g., ``microdrop.command_plugin.get_commands``).
+
+        .. versionadded:: 2.12
+        '''
+        return self.ui_client.metrics.stats()
+
+    def get_video_toggle_stats(self):
+        '''
+        Returns
+        -------
+        dict
+            Statistics of video toggles sent asynchronously (see
+            ``async_step_video`` app option), including counts of late and
+            failed toggles and most recent errors.
+
+        .. versionadded:: 2.12
+        '''
+        return self.video_toggler.stats()
+
+    def get_supervisor_stats(self):
+        '''
+        Returns
+        -------
+        dict
+            Device UI process supervisor statistics (e.g., restart count, exit
+            counts by exit class, accumulated downtime).
+
+        .. versionadded:: 2.12
+        '''
+        return self.supervisor.stats()
+
+    def cleanup(self, timeout_s=5):
         '''
         .. versionchanged:: 2.2.2
             Catch any exception encountered during GUI process termination.
@@ -192,17 +467,26 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
 
         .. versionchanged:: 2.7
             Only try to terminate the GUI process if it is still running.
+
+        .. versionchanged:: 2.12
+            Stop supervising device UI process (rather than removing keep-alive
+            timer) before terminating it.  Terminate process tree within
+            ``timeout_s`` seconds and log which processes exited and when.
         '''
-        logger.info('Stop DMF device UI keep-alive timer')
-        if self.gui_heartbeat_id is not None:
-            # Stop keep-alive polling of device UI process.
-            gobject.source_remove(self.gui_heartbeat_id)
-        if self.gui_process is not None and self.gui_process.poll() is None:
+        logger.info('Stop supervising DMF device UI process')
+        self.supervisor.unwatch()
+        if (self.gui_process is not None and
+                self.supervisor.poll(self.gui_process) is None):
             logger.info('Terminate DMF device UI process')
             try:
-                kill_process_tree(self.gui_process.pid)
-                logger.info('Close DMF device UI process `%s`',
-                            self.gui_process.pid)
+                report = kill_process_tree(self.gui_process.pid,
+                                           timeout_s=timeout_s,
+                                           graceful_timeout_s=min(1, .5 *
+                                                                  timeout_s))
+                logger.info('Close DMF device UI process `%s` in %.2fs '
+                            '(terminated: %s, killed: %s, still alive: %s)',
+                            self.gui_process.pid, report.duration_s,
+                            report.terminated, report.killed, report.alive)
             except Exception:
                 logger.info('Unexpected error closing DMF device UI process '
                             '`%s`', self.gui_process.pid, exc_info=True)
@@ -210,30 +494,71 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
             logger.info('No active DMF device UI process')
         self.alive_timestamp = None
 
-    def wait_for_gui_process(self, retry_count=20, retry_duration_s=1):
+    def wait_for_gui_process(self, timeout_s=20, ping_timeout_s=.5):
         '''
+        Wait for device UI process to announce that it is connected to the hub.
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Overall deadline (in seconds) to wait for the device UI process.
+        ping_timeout_s : float, optional
+            Maximum duration (in seconds) of each readiness probe.
+
+        Raises
+        ------
+        IOError
+            If the device UI process exits or does not connect to the hub
+            before the deadline.
+
         .. versionchanged:: 2.7.2
             Do not execute `refresh_gui()` while waiting for response from
             `hub_execute()`.
+
+        .. versionchanged:: 2.12
+            Probe device UI process until it responds through the hub, it
+            exits, or a single deadline elapses, rather than polling with a
+            fixed number of retries.  Limit each probe to an adaptive
+            deadline (at most ``ping_timeout_s``) learned from recent ping
+            latencies (see :meth:`DeviceUiClient.deadline`), and back off
+            briefly between probes.  Do not execute `refresh_gui()` (this
+            method is no longer called from the GTK thread).
         '''
+        from si_prefix import si_format
+
         start = datetime.now()
-        for i in xrange(retry_count):
+        gui_process = self.gui_process
+        deadline = time.time() + timeout_s
+        attempt = 0
+
+        while True:
+            duration_s = (datetime.now() - start).total_seconds()
+            returncode = self.supervisor.poll(gui_process)
+            remaining_s = deadline - time.time()
+            if returncode is not None:
+                raise IOError('GUI process exited with code %s after %ss '
+                              'before connecting to hub.' %
+                              (returncode, si_format(duration_s)))
+            elif remaining_s <= 0:
+                raise IOError('Timed out after %ss waiting for GUI process to '
+                              'connect to hub.' % si_format(duration_s))
+            attempt += 1
             try:
-                hub_execute(self.name, 'ping', timeout_s=5, silent=True)
+                timeout_s = self.ui_client.deadline('ping', ping_timeout_s)
+                self.ui_client.execute('ping',
+                                       timeout_s=min(timeout_s, remaining_s),
+                                       silent=True)
             except Exception:
-                logger.debug('[wait_for_gui_process] failed (%d of %d)', i + 1,
-                             retry_count, exc_info=True)
+                logger.debug('[wait_for_gui_process] probe %d failed',
+                             attempt, exc_info=True)
+                # Device UI is not connected to the hub yet.  Back off
+                # briefly before next probe.
+                time.sleep(max(min(.05, deadline - time.time()), 0))
             else:
-                logger.info('[wait_for_gui_process] success (%d of %d)', i + 1,
-                            retry_count)
-                self.alive_timestamp = datetime.now()
-                return
-            for j in xrange(10):
-                time.sleep(retry_duration_s / 10.)
-                refresh_gui()
-        raise IOError('Timed out after %ss waiting for GUI process to connect '
-                      'to hub.' % si_format((datetime.now() -
-                                             start).total_seconds()))
+                break
+        self.alive_timestamp = datetime.now()
+        logger.info('[wait_for_gui_process] ready after %ss',
+                    si_format((datetime.now() - start).total_seconds()))
 
     def get_schedule_requests(self, function_name):
         """
@@ -256,19 +581,51 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
                               'droplet_planning_plugin')]
         return []
 
-    def on_app_exit(self):
-        logger.info('Get current video settings from DMF device UI plugin.')
-        json_settings = self.get_ui_json_settings()
-        self.save_ui_settings(json_settings)
+    def on_app_exit(self, timeout_s=3):
+        '''
+        .. versionchanged:: 2.12
+            Capture device UI settings and terminate device UI process within
+            a single overall time budget of ``timeout_s`` seconds (including
+            any wire format negotiation).  Any setting not captured in time
+            falls back to its last known value.
+
+            If settings are auto-saved (see ``autosave_interval_s`` app
+            option), only persist pending auto-save changes instead of
+            capturing settings.
+
+            Write any pending app values (see :meth:`save_ui_settings`).
+        '''
+        deadline = time.time() + timeout_s
+        if self.autosaver is not None:
+            self._stop_autosave(timeout_s=.5 * timeout_s)
+        else:
+            logger.info('Get current video settings from DMF device UI '
+                        'plugin.')
+            # Reserve at least half of the budget to terminate the process
+            # tree.
+            json_settings = self.get_ui_json_settings(timeout_s=.5 *
+                                                      timeout_s)
+            self.save_ui_settings(json_settings)
+        self.flush_app_values()
         self._gui_enabled = False
-        self.cleanup()
+        self.standby_pool.stop()
+        self.cleanup(timeout_s=max(deadline - time.time(), 0))
 
     # #########################################################################
     # # DMF device UI 0MQ plugin settings
-    def get_ui_json_settings(self):
+    def get_ui_json_settings(self, timeout_s=2, fields=UI_STATE_FIELDS):
         '''
         Get current video settings from DMF device UI plugin.
 
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Overall deadline (in seconds) to wait for settings.
+        fields : list, optional
+            UI state fields to get (subset of :data:`.rpc.UI_STATE_FIELDS`).
+
+            .. versionadded:: 2.12
+
         Returns
         -------
 
@@ -279,50 +636,127 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
         .. versionchanged:: 2.7.2
             Do not execute `refresh_gui()` while waiting for response from
             `hub_execute()`.
-        '''
-        video_settings = {}
 
-        # Try to request video configuration.
+        .. versionchanged:: 2.12
+            Request video configuration, corners, and surface alphas in a
+            single batched ``get_ui_state`` request if supported by device
+            UI.  Otherwise, request them one at a time within a single
+            deadline.  Use last known value of any setting not received before
+            the deadline.
+
+            Record fingerprint of each setting received, so settings already
+            in effect are not applied again by :meth:`set_ui_settings`.
+
+            Limit each request to an adaptive deadline (at most ``timeout_s``)
+            learned from recent latencies, so a hung device UI is detected
+            quickly.
+        '''
+        deadline = time.time() + timeout_s
         try:
-            video_config = hub_execute(self.name, 'get_video_config',
-                                       timeout_s=2)
-        except IOError:
-            logger.warning('Timed out waiting for device window size and '
-                           'position request.')
-        else:
-            if video_config is not None:
-                video_settings['video_config'] = video_config.to_json()
+            state, errors = self.ui_client.get_ui_state(fields=fields,
+                                                        timeout_s=timeout_s)
+        except CommandNotSupported:
+            state, errors = self._get_ui_state_individually(deadline, fields)
+        except Exception as exception:
+            state, errors = {}, dict.fromkeys(fields, str(exception))
+
+        video_settings = {}
+        for field in fields:
+            if field in state:
+                value = state[field]
+                json_state = self._ui_state_as_json(field, value)
+                video_settings.update(json_state)
+                self._update_fingerprint(field, value, json_state)
             else:
-                video_settings['video_config'] = ''
+                logger.warning('Error getting device UI `%s` (%s); use last '
+                               'known values.', field, errors.get(field))
+                keys = self._UI_STATE_JSON_KEYS[field]
+                video_settings.update(dict([(k, v) for k, v in
+                                            self._last_ui_json_settings
+                                            .iteritems() if k in keys]))
+        self._last_ui_json_settings.update(video_settings)
+        return video_settings
 
-        # Try to request allocation to save in app options.
-        try:
-            data = hub_execute(self.name, 'get_corners', timeout_s=2)
-        except IOError:
-            logger.warning('Timed out waiting for device window size and '
-                           'position request.')
+    def _update_fingerprint(self, field, value, json_state):
+        '''
+        Record fingerprint of UI state field read from device UI.
+
+        .. versionadded:: 2.12
+        '''
+        fingerprints = self.ui_client.fingerprints
+        if field == 'corners':
+            corners = [json_state.get(k) for k in ('canvas_corners',
+                                                   'frame_corners')]
+            if all(corners):
+                fingerprints[field] = fingerprint(*corners)
+            else:
+                fingerprints.pop(field, None)
         else:
+            fingerprints[field] = fingerprint(value)
+
+    #: Keys of JSON-compatible settings derived from each UI state field.
+    _UI_STATE_JSON_KEYS = {'video_config': ('video_config', ),
+                           'corners': ('canvas_corners', 'frame_corners', 'x',
+                                       'y', 'width', 'height'),
+                           'surface_alphas': ('surface_alphas', )}
+
+    def _get_ui_state_individually(self, deadline, fields=UI_STATE_FIELDS):
+        '''
+        Request each field of UI state using individual commands (i.e., if
+        batched ``get_ui_state`` command is not supported), one at a time.
+        Once a request times out, remaining fields are not requested.
+
+        Returns
+        -------
+        tuple
+            ``(state, errors)``, as returned by
+            :meth:`DeviceUiClient.get_ui_state`.
+
+        .. versionadded:: 2.12
+        '''
+        state = {}
+        errors = {}
+        timed_out = None
+        for field in fields:
+            remaining_s = deadline - time.time()
+            if timed_out is not None or remaining_s <= 0:
+                # Device UI is not responding; do not wait for other fields.
+                errors[field] = timed_out or 'Timed out.'
+                continue
+            command = 'get_' + field
+            try:
+                state[field] = \
+                    self.ui_client.execute(command,
+                                           timeout_s=self.ui_client
+                                           .deadline(command, remaining_s))
+            except IOError as exception:
+                timed_out = errors[field] = str(exception)
+            except Exception as exception:
+                errors[field] = str(exception)
+        return state, errors
+
+    @staticmethod
+    def _ui_state_as_json(field, value):
+        '''
+        Convert field of UI state to JSON-compatible settings.
+
+        .. versionadded:: 2.12
+        '''
+        video_settings = {}
+        if field == 'corners':
+            data = value
             if data:
                 # Get window allocation settings (i.e., width, height, x, y).
 
-                # Replace `df_..._corners` with CSV string named `..._corners`
-                # (no `df_` prefix).
+                # Replace `df_..._corners` with corners string (see
+                # `as_text`) named `..._corners` (no `df_` prefix).
                 for k in ('df_canvas_corners', 'df_frame_corners'):
                     if k in data:
-                        data['allocation'][k[3:]] = data.pop(k).to_csv()
+                        data['allocation'][k[3:]] = as_text(data.pop(k))
                 video_settings.update(data['allocation'])
-
-        # Try to request surface alphas.
-        try:
-            surface_alphas = hub_execute(self.name, 'get_surface_alphas',
-                                         timeout_s=2)
-        except IOError:
-            logger.warning('Timed out waiting for surface alphas.')
         else:
-            if surface_alphas is not None:
-                video_settings['surface_alphas'] = surface_alphas.to_json()
-            else:
-                video_settings['surface_alphas'] = ''
+            # Video config or surface alphas.
+            video_settings[field] = as_text(value)
         return video_settings
 
     def get_ui_settings(self):
@@ -353,28 +787,61 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
         Returns
         -------
 
-            (dict) : DMF device UI plugin settings in Python types expected by
-                DMF device UI plugin 0MQ commands.
+            (dict) : DMF device UI plugin settings as settings models (see
+                :mod:`.settings`), which are converted to Python types
+                expected by DMF device UI plugin 0MQ commands when sent.
+
+
+        .. versionchanged:: 2.12
+            Return lightweight settings models instead of :mod:`pandas`
+            objects, so :mod:`pandas` is not imported to convert settings
+            (see :mod:`.settings`).  Corners are decoded from compact
+            encoding or CSV with the default layout (see :mod:`.corners`);
+            CSV corners with any other layout are still parsed as
+            :class:`pandas.DataFrame`.
+
+            Memoize conversion, keyed by hash of raw settings strings, so
+            identical settings are only parsed once.
+        '''
+        keys = CORNERS_KEYS + ('video_config', 'surface_alphas')
+        cache_key = (tuple(k in json_settings for k in keys),
+                     fingerprint(*[json_settings.get(k) for k in keys]))
+        py_settings = self._settings_cache.get(cache_key)
+        if py_settings is None:
+            py_settings = self._json_settings_as_python(json_settings)
+            self._settings_cache.put(cache_key, py_settings)
+        # Settings values are shared between calls and must not be modified
+        # in place; copy dictionary so callers may add or replace entries.
+        return dict(py_settings)
+
+    def _json_settings_as_python(self, json_settings):
+        '''
+        .. versionadded:: 2.12
         '''
         py_settings = {}
 
-        corners = dict([(k, json_settings.get(k))
-                        for k in ('canvas_corners', 'frame_corners')])
+        corners = dict([(k, json_settings.get(k)) for k in CORNERS_KEYS])
 
         if all(corners.values()):
-            # Convert CSV corners lists for canvas and frame to
-            # `pandas.DataFrame` instances
+            # Convert corners lists for canvas and frame to settings models.
             for k, v in corners.iteritems():
+                try:
+                    df_corners = Corners.from_text(v)
+                except ValueError:
+                    # CSV with custom layout.
+                    import pandas as pd
+
+                    df_corners = pd.read_csv(io.BytesIO(bytes(v)),
+                                             index_col=0)
                 # Prepend `'df_'` to key to indicate the type as a data frame.
-                py_settings['df_' + k] = pd.read_csv(io.BytesIO(bytes(v)),
-                                                     index_col=0)
+                py_settings['df_' + k] = df_corners
 
-        for k in ('video_config', 'surface_alphas'):
-            if k in json_settings:
-                if not json_settings[k]:
-                    py_settings[k] = pd.Series(None)
-                else:
-                    py_settings[k] = pd.Series(json.loads(json_settings[k]))
+        if 'video_config' in json_settings:
+            py_settings['video_config'] = \
+                VideoConfig.from_text(json_settings['video_config'])
+        if 'surface_alphas' in json_settings:
+            py_settings['surface_alphas'] = \
+                SurfaceAlphas.from_text(json_settings['surface_alphas'])
 
         return py_settings
 
@@ -390,17 +857,135 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
             video_settings (dict) : DMF device UI plugin settings in
                 JSON-compatible format returned by `get_ui_json_settings`
                 method (i.e., only basic Python data types).
+
+
+        .. versionchanged:: 2.12
+            Only write settings that differ from app values (rather than all
+            app values).  Writes made in quick succession are coalesced into
+            a single write, made by the GTK main loop (see
+            :meth:`flush_app_values`).
         '''
         app_values = self.get_app_values()
-        # Select subset of app values that are present in `video_settings`.
-        app_video_values = dict([(k, v) for k, v in app_values.iteritems()
-                                 if k in video_settings.keys()])
+        changed = dict([(k, v) for k, v in video_settings.iteritems()
+                        if k not in app_values or app_values[k] != v])
+        if changed:
+            self._app_values_writer.update(changed)
+
+    def get_app_values(self):
+        '''
+        .. versionchanged:: 2.12
+            Include app values not written yet (see
+            :meth:`save_ui_settings`).
+        '''
+        app_values = super(DmfDeviceUiPlugin, self).get_app_values()
+        app_values.update(self._app_values_writer.pending())
+        return app_values
+
+    def flush_app_values(self):
+        '''
+        Write pending app values now (see :meth:`save_ui_settings`).
+
+        Must be called from the GTK thread.
+
+        .. versionadded:: 2.12
+        '''
+        self._app_values_writer.flush()
+
+    def get_ui_profiles(self):
+        '''
+        Returns
+        -------
+        dict
+            Device (or camera) id of each named settings profile (or
+            ``None``), keyed by profile name.
+
+        .. versionadded:: 2.12
+        '''
+        return self.profiles.get_profiles()
 
-        # If the specified video settings differ from app values, update
-        # app values.
-        if app_video_values != video_settings:
-            app_values.update(video_settings)
-            self.set_app_values(app_values)
+    def save_ui_profile(self, name, device_id=None, timeout_s=2):
+        '''
+        Save current device UI settings (video config, surface alphas, and
+        corners) as named settings profile.
+
+        Parameters
+        ----------
+        name : str
+            Profile name (replaces any existing profile with the same name).
+        device_id : str, optional
+            Device (or camera) id to index profile by (see
+            :meth:`apply_ui_profile`).
+        timeout_s : float, optional
+            Overall deadline (in seconds) to wait for settings.
+
+        Profiles are written to app values with other pending app values
+        (see :meth:`save_ui_settings`).
+
+        .. versionadded:: 2.12
+        '''
+        json_settings = self.get_ui_json_settings(timeout_s=timeout_s)
+        self.profiles.save(name, json_settings, device_id=device_id)
+        self._app_values_writer.update({'ui_profiles':
+                                        self.profiles.to_text()})
+
+    def remove_ui_profile(self, name):
+        '''
+        Raises
+        ------
+        KeyError
+            If profile does not exist.
+
+        .. versionadded:: 2.12
+        '''
+        self.profiles.remove(name)
+        self._app_values_writer.update({'ui_profiles':
+                                        self.profiles.to_text()})
+
+    def apply_ui_profile(self, name=None, device_id=None):
+        '''
+        Apply named settings profile to device UI and persist its settings as
+        current settings (i.e., applied when device UI is next started).
+
+        Profile settings are already converted, so only settings that differ
+        from device UI settings are sent, in a single ``apply_ui_settings``
+        request (if supported by device UI process).
+
+        Parameters
+        ----------
+        name : str, optional
+            Profile name.
+        device_id : str, optional
+            Device (or camera) id; apply most recently saved profile for
+            device id if ``name`` is not specified.
+
+        Returns
+        -------
+        str
+            Name of applied profile.
+
+        Raises
+        ------
+        KeyError
+            If profile does not exist.
+        IOError
+            If device UI process is not ready.
+
+        .. versionadded:: 2.12
+        '''
+        if name is None:
+            name = self.profiles.find(device_id)
+            if name is None:
+                raise KeyError('No settings profile for device `%s`.' %
+                               device_id)
+        ui_settings = self.profiles.ui_settings(name)
+        self.set_ui_settings(ui_settings, default_corners=True)
+        json_settings = self.profiles.json_settings(name)
+        self._last_ui_json_settings.update(json_settings)
+        self.save_ui_settings(json_settings)
+        if self.autosaver is not None:
+            self.autosaver.mark_persisted(json_settings)
+        logger.info('Applied device UI settings profile `%s`.', name)
+        return name
 
     def set_ui_settings(self, ui_settings, default_corners=False):
         '''
@@ -416,40 +1001,151 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
         .. versionchanged:: 2.7.2
             Do not execute `refresh_gui()` while waiting for response from
             `hub_execute()`.
+
+        .. versionchanged:: 2.12
+            Record each applied setting in current start up timeline.
+
+            Apply all settings in a single ``apply_ui_settings`` request (one
+            round trip and one redraw), if supported by device UI process.
+
+            Skip settings whose fingerprint matches the settings last applied
+            to (or read from) the current device UI process.  Corners are
+            always applied if ``default_corners`` is ``True``.
+
+            Settings are not read back (i.e., there is no fallback if a
+            setting is not applied), so each request waits up to 5 s rather
+            than for an adaptive deadline (see
+            :meth:`DeviceUiClient.deadline`).
         '''
         if self.alive_timestamp is None or self.gui_process is None:
             # Repeat until GUI process has started.
             raise IOError('GUI process not ready.')
 
-        if 'video_config' in ui_settings:
-            hub_execute(self.name, 'set_video_config',
-                        video_config=ui_settings['video_config'], timeout_s=5)
-
-        if 'surface_alphas' in ui_settings:
-            hub_execute(self.name, 'set_surface_alphas',
-                        surface_alphas=ui_settings['surface_alphas'],
-                        timeout_s=5)
-
+        # Fingerprint of each setting to apply, keyed by UI state field.
+        fingerprints = {}
+        for k in ('video_config', 'surface_alphas'):
+            if k in ui_settings:
+                fingerprints[k] = fingerprint(ui_settings[k])
         if all((k in ui_settings) for k in ('df_canvas_corners',
                                             'df_frame_corners')):
-            if default_corners:
-                hub_execute(self.name, 'set_default_corners',
-                            canvas=ui_settings['df_canvas_corners'],
-                            frame=ui_settings['df_frame_corners'], timeout_s=5)
+            fingerprints['corners'] = \
+                fingerprint(ui_settings['df_canvas_corners'],
+                            ui_settings['df_frame_corners'])
+
+        applied = self.ui_client.fingerprints
+        changed = [field for field, fingerprint_i in fingerprints.iteritems()
+                   if applied.get(field) != fingerprint_i or
+                   (field == 'corners' and default_corners)]
+        if not changed:
+            logger.debug('Device UI settings unchanged; skip applying.')
+            return
+        logger.debug('Apply changed device UI settings: %s', changed)
+
+        if self.ui_client.supports('apply_ui_settings'):
+            settings = dict([(k, ui_settings[k]) for k in changed
+                             if k != 'corners'])
+            if 'corners' in changed:
+                for k in ('df_canvas_corners', 'df_frame_corners'):
+                    settings[k] = ui_settings[k]
+            for field in changed:
+                applied.pop(field, None)
+            try:
+                self.ui_client.apply_ui_settings(settings, default_corners,
+                                                 timeout_s=5)
+            except CommandNotSupported:
+                pass
+            else:
+                for field in changed:
+                    applied[field] = fingerprints[field]
+                    self._mark_startup('%s_applied' % field)
+                return
+
+        for field in ('video_config', 'surface_alphas', 'corners'):
+            if field not in changed:
+                continue
+            # Forget fingerprint in case setting is only partially applied.
+            applied.pop(field, None)
+            if field == 'video_config':
+                self.ui_client.execute('set_video_config',
+                                       video_config=as_pandas(
+                                           ui_settings['video_config']),
+                                       timeout_s=5)
+            elif field == 'surface_alphas':
+                self.ui_client.execute('set_surface_alphas',
+                                       surface_alphas=as_pandas(
+                                           ui_settings['surface_alphas']),
+                                       timeout_s=5)
+            elif default_corners:
+                self.ui_client.execute('set_default_corners',
+                                       canvas=as_pandas(ui_settings
+                                                        ['df_canvas_corners']),
+                                       frame=as_pandas(ui_settings
+                                                       ['df_frame_corners']),
+                                       timeout_s=5)
             else:
-                hub_execute(self.name, 'set_corners',
-                            df_canvas_corners=ui_settings['df_canvas_corners'],
-                            df_frame_corners=ui_settings['df_frame_corners'],
-                            timeout_s=5)
+                self.ui_client.execute('set_corners',
+                                       df_canvas_corners=as_pandas(
+                                           ui_settings['df_canvas_corners']),
+                                       df_frame_corners=as_pandas(
+                                           ui_settings['df_frame_corners']),
+                                       timeout_s=5)
+            applied[field] = fingerprints[field]
+            self._mark_startup('%s_applied' % field)
 
     # #########################################################################
     # # Plugin signal handlers
     def on_plugin_disable(self):
+        '''
+        .. versionchanged:: 2.12
+            Stop auto-save of device UI settings (persisting any pending
+            changes) and write any pending app values.
+        '''
         self._gui_enabled = False
+        self._stop_autosave()
+        self.flush_app_values()
+        self.standby_pool.stop()
         self.cleanup()
 
+    def on_app_options_changed(self, plugin_name):
+        '''
+        .. versionadded:: 2.12
+            Start or stop warm-standby device UI process according to
+            ``warm_standby`` app option.  Restart auto-save of device UI
+            settings according to ``autosave_interval_s`` app option.
+        '''
+        if plugin_name != self.name or not self._gui_enabled:
+            return
+        app_values = self.get_app_values()
+        if app_values.get('warm_standby'):
+            self.standby_pool.start()
+        else:
+            self.standby_pool.stop()
+        autosave_interval_s = (self.autosaver.interval_s
+                               if self.autosaver is not None else 0)
+        if (self._ui_settings_synced and
+                (app_values.get('autosave_interval_s') or 0) !=
+                autosave_interval_s):
+            self._start_autosave()
+
     def on_plugin_enable(self):
+        '''
+        .. versionchanged:: 2.12
+            Clear any crash loop state of device UI process supervisor.
+            Migrate corners stored as CSV to compact encoding (see
+            :mod:`.corners`).  Load named settings profiles (see
+            :meth:`apply_ui_profile`).
+        '''
         super(DmfDeviceUiPlugin, self).on_plugin_enable()
+        migrated = migrate_corners(self.get_app_values())
+        if migrated:
+            logger.info('Migrate corners app values to compact encoding.')
+            self.set_app_values(migrated)
+        try:
+            self.profiles.load(self.get_app_values().get('ui_profiles'))
+        except (KeyError, TypeError, ValueError):
+            logger.warning('Error loading device UI settings profiles.',
+                           exc_info=True)
+        self.supervisor.reset()
         self.reset_gui()
 
     def on_step_run(self):
@@ -463,20 +1159,51 @@ class DmfDeviceUiPlugin(AppDataController, StepOptionsController, Plugin):
         .. versionchanged:: 2.2.2
             Emit ``on_step_complete`` signal within thread-safe function, since
             signal callbacks may use GTK.
+
+        .. versionchanged:: 2.12
+            If ``async_step_video`` app option is enabled, queue video toggle
+            to be sent in the background and complete step immediately.  Late
+            and failed toggles are reported by
+            :meth:`get_video_toggle_stats`.
+
+            Only send video toggle if ``video_enabled`` differs from the video
+            state last requested from the device UI process (e.g., at steps
+            where ``video_enabled`` changes, or after the device UI process
+            restarts).  Video enabled or disabled by the user in the device
+            UI is therefore no longer re-applied at every step.  Wait up to
+            5 s for video toggle (rather than the hub default).
         '''
         app = get_app()
 
         if (app.realtime_mode or app.running) and self.gui_process is not None:
-            step_options = self.get_step_options()
-            if not step_options['video_enabled']:
-                command = 'disable_video'
-            else:
-                command = 'enable_video'
-
-            hub_execute(self.name, command)
+            video_enabled = bool(self.get_step_options()['video_enabled'])
+            if self.ui_client.video_enabled != video_enabled:
+                self._send_video_toggle(video_enabled)
 
             # Call as thread-safe function, since signal callbacks may use GTK.
             gtk_threadsafe(emit_signal)('on_step_complete', [self.name, None])
 
+    def _send_video_toggle(self, video_enabled):
+        '''
+        Enable or disable video in device UI.
+
+        .. versionadded:: 2.12
+        '''
+        command = 'enable_video' if video_enabled else 'disable_video'
+        self.ui_client.video_enabled = video_enabled
+        if self.get_app_values().get('async_step_video'):
+            def _on_sent(future):
+                if future.exception() is not None:
+                    # Video state of device UI is unknown.
+                    self.ui_client.video_enabled = None
+
+            self.video_toggler.submit(command).add_done_callback(_on_sent)
+        else:
+            try:
+                self.ui_client.execute(command, timeout_s=5)
+            except Exception:
+                self.ui_client.video_enabled = None
+                raise
+
 
 PluginGlobals.pop_env()
@@ -0,0 +1,164 @@
+'''
+Periodically persist device UI settings changed in the device UI.
+
+.. versionadded:: 2.12
+'''
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AutoSaver(object):
+    '''
+    Capture settings in a background thread every ``interval_s`` seconds and
+    persist settings that changed since they were last persisted.
+
+    The device UI does not report which settings changed, so a single field
+    is captured per interval: a *dirty* field (i.e., with changes not
+    persisted yet) if any, otherwise each field in turn.  Only changed
+    settings are persisted, once they are unchanged when their field is next
+    captured (i.e., debounced, e.g., while corners are being dragged), or
+    once they have been pending for ``max_pending`` captures.
+
+    Parameters
+    ----------
+    capture : function
+        Called with a field name; returns current settings of field as a
+        ``dict``, or ``None`` if settings cannot be captured (e.g., device UI
+        is not ready).
+    persist : function
+        Called (in the auto-save thread) with ``dict`` of changed settings to
+        persist, e.g., wrapped with
+        :func:`pygtkhelpers.gthreads.gtk_threadsafe` to persist settings in
+        the GTK thread.
+    persisted : dict
+        Settings currently persisted.
+    fields : list
+        Fields to capture.
+    interval_s : float, optional
+        Capture interval.
+    max_pending : int, optional
+        Maximum number of captures changed settings may wait to be persisted.
+    '''
+    def __init__(self, capture, persist, persisted, fields, interval_s=3,
+                 max_pending=3):
+        self.capture = capture
+        self.persist = persist
+        self.fields = list(fields)
+        self.interval_s = interval_s
+        self.max_pending = max_pending
+        self.saves = 0
+        self._persisted = dict(persisted)
+        # Changed settings not persisted yet, as ``(value, count)`` tuples,
+        # where ``count`` is the number of captures the value has been
+        # pending.
+        self._pending = {}
+        # Fields with pending changes, in the order they became dirty.
+        self._dirty = []
+        # Index of next field to capture when no field is dirty.
+        self._next = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='dmf_device_ui_autosave')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout_s=1):
+        '''
+        Stop capturing settings (pending changes are kept; see
+        :meth:`flush`).
+        '''
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout_s)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.tick()
+            except Exception:
+                logger.warning('Error auto-saving device UI settings.',
+                               exc_info=True)
+
+    def tick(self):
+        '''
+        Capture settings of next field and persist any changes that are due.
+        '''
+        with self._lock:
+            dirty = bool(self._dirty)
+            if dirty:
+                field = self._dirty.pop(0)
+            else:
+                field = self.fields[self._next % len(self.fields)]
+                self._next += 1
+        settings = self.capture(field)
+        if settings is None:
+            if dirty:
+                # Capture field again next time.
+                with self._lock:
+                    self._dirty.insert(0, field)
+            return
+        due = {}
+        with self._lock:
+            for key, value in settings.items():
+                if self._persisted.get(key) == value:
+                    # Unchanged (or changed back).
+                    self._pending.pop(key, None)
+                    continue
+                pending_value, count = self._pending.get(key, (None, 0))
+                if ((count and pending_value == value) or
+                        count >= self.max_pending):
+                    del self._pending[key]
+                    due[key] = value
+                else:
+                    # Wait for setting to settle.
+                    self._pending[key] = (value, count + 1)
+            if any(key in self._pending for key in settings):
+                self._dirty.append(field)
+        if due:
+            self._persist(due)
+
+    def flush(self, persist=None):
+        '''
+        Persist pending changes (e.g., on exit).
+
+        Parameters
+        ----------
+        persist : function, optional
+            Called instead of ``persist`` function passed to constructor
+            (e.g., to persist synchronously on exit).
+        '''
+        with self._lock:
+            pending = dict([(k, value) for k, (value, count)
+                            in self._pending.items()])
+        if pending:
+            self._persist(pending, persist)
+
+    def mark_persisted(self, settings):
+        '''
+        Record settings persisted by other means (e.g., when a settings
+        profile is applied), so they are not persisted again.
+        '''
+        with self._lock:
+            self._persisted.update(settings)
+            for key in settings:
+                self._pending.pop(key, None)
+
+    def _persist(self, changed, persist=None):
+        logger.info('Auto-save device UI settings: %s', sorted(changed))
+        (persist or self.persist)(changed)
+        with self._lock:
+            self._persisted.update(changed)
+            for key, value in changed.items():
+                if self._pending.get(key, (None, ))[0] == value:
+                    del self._pending[key]
+            self.saves += 1
@@ -0,0 +1,268 @@
+'''
+Run blocking calls (e.g., hub requests) in background threads.
+
+.. versionadded:: 2.12
+'''
+from Queue import Queue
+import logging
+import threading
+import time
+
+import gobject
+
+logger = logging.getLogger(__name__)
+
+
+def wait_event(event, timeout=None):
+    '''
+    Wait for event to be set, responding promptly once it is set.
+
+    In Python 2, :meth:`threading.Event.wait` with a timeout polls with sleeps
+    of up to 50 ms, so waiting in short slices cuts the delay between the
+    event being set and the waiter waking up.
+
+    Returns
+    -------
+    bool
+        ``True`` if event is set.
+    '''
+    if timeout is None:
+        event.wait()
+        return True
+    deadline = time.time() + timeout
+    while not event.is_set():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        event.wait(min(remaining, .005))
+    return event.is_set()
+
+
+class Future(object):
+    '''
+    Result of a call running in a background thread.
+    '''
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def _set_done(self):
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._invoke(callback)
+
+    def _invoke(self, callback):
+        try:
+            callback(self)
+        except Exception:
+            logger.error('Error in future callback `%s`', callback,
+                         exc_info=True)
+
+    def set_result(self, result):
+        self._result = result
+        self._set_done()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._set_done()
+
+    def add_done_callback(self, callback):
+        '''
+        Call ``callback(future)`` once call has completed (immediately, if
+        call has already completed).
+
+        The callback is called in the thread that completed the call, so
+        callbacks that use GTK must be wrapped, e.g., using
+        :func:`pygtkhelpers.gthreads.gtk_threadsafe`.
+        '''
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        self._invoke(callback)
+
+    def exception(self):
+        '''
+        Returns
+        -------
+        Exception or None
+            Exception raised by call (if any).
+        '''
+        return self._exception
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        '''
+        Returns
+        -------
+        bool
+            ``True`` if call has completed.
+        '''
+        return wait_event(self._done, timeout)
+
+    def result(self, timeout=None):
+        '''
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum duration (in seconds) to wait for result.
+
+        Returns
+        -------
+        object
+            Return value of call.
+
+        Raises
+        ------
+        IOError
+            If call did not complete within ``timeout``.
+        Exception
+            Any exception raised by call.
+        '''
+        if not self.wait(timeout):
+            raise IOError('Timed out waiting for result.')
+        elif self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+class SerialWorker(object):
+    '''
+    Run calls one at a time, in order, in a background (daemon) thread.
+
+    The thread is started when the first call is queued.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of worker thread.
+    '''
+    def __init__(self, name=None):
+        self.name = name
+        self._queue = Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            future, func, args, kwargs = self._queue.get()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as exception:
+                future.set_exception(exception)
+
+    def submit(self, func, *args, **kwargs):
+        '''
+        Queue call.
+
+        Returns
+        -------
+        Future
+            Result of call.
+        '''
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name=self.name)
+                self._thread.daemon = True
+                self._thread.start()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def pending(self):
+        '''
+        Returns
+        -------
+        int
+            Approximate number of queued calls not yet started.
+        '''
+        return self._queue.qsize()
+
+
+class CoalescedWriter(object):
+    '''
+    Coalesce writes of values (e.g., app values) made in quick succession
+    into a single write of the latest value of each changed key.
+
+    Pending values are written by the GTK main loop (or by :meth:`flush`),
+    so ``write`` is called in the GTK thread if :meth:`flush` is.
+
+    Parameters
+    ----------
+    write : function
+        Called with ``dict`` of values to write.
+    delay_s : float, optional
+        Duration (in seconds) to wait after the first pending update before
+        writing.
+    '''
+    def __init__(self, write, delay_s=.5):
+        self.write = write
+        self.delay_s = delay_s
+        self.writes = 0
+        self._pending = {}
+        # Values being written (still reported as pending until written).
+        self._writing = {}
+        self._source_id = None
+        self._lock = threading.Lock()
+
+    def update(self, values):
+        '''
+        Queue values to write (replaces any pending value of the same key).
+
+        May be called from any thread.
+        '''
+        with self._lock:
+            self._pending.update(values)
+            if self._source_id is None:
+                self._source_id = gobject.timeout_add(int(self.delay_s * 1000),
+                                                      self._on_timeout)
+
+    def pending(self):
+        '''
+        Returns
+        -------
+        dict
+            Values not written yet.
+        '''
+        with self._lock:
+            pending = dict(self._writing)
+            pending.update(self._pending)
+            return pending
+
+    def _on_timeout(self):
+        with self._lock:
+            self._source_id = None
+        self.flush()
+        # Do not repeat timeout.
+        return False
+
+    def flush(self):
+        '''
+        Write pending values now (e.g., on exit).
+
+        Must be called from the GTK thread, so writes are not reordered.
+        '''
+        with self._lock:
+            if self._source_id is not None:
+                gobject.source_remove(self._source_id)
+                self._source_id = None
+            pending, self._pending = self._pending, {}
+            self._writing = pending
+        if not pending:
+            return
+        try:
+            # Write without holding lock, since `write` may (indirectly) read
+            # pending values.
+            self.write(pending)
+        finally:
+            with self._lock:
+                self._writing = {}
+        self.writes += 1
@@ -0,0 +1,366 @@
+'''
+Benchmark DMF device UI plugin against a local hub and a fake device UI.
+
+The plugin is run against stand-ins for the MicroDrop hub and app (see
+``standins/microdrop``), a fake device UI process (see
+``standins/dmf_device_ui``), and a headless main loop (see
+``standins/gobject.py``), so no display or camera is required.
+
+The following are measured:
+
+ - ``cold_start``: enable plugin until device UI start up has finished.
+ - ``restart_recovery``: device UI exit until restarted device UI is ready
+   (with and without warm-standby process).
+ - ``step_run``: ``on_step_run`` until ``on_step_complete`` is emitted, with
+   video toggled every step (with and without asynchronous video toggles),
+   or every 50 steps (``step_run_video_runs``).
+ - ``get_ui_json_settings``/``set_ui_settings``: settings round trips.
+ - ``set_ui_settings_changed``: apply settings that differ from device UI
+   state (unchanged settings are skipped by ``set_ui_settings``).
+ - ``hung_get_ui_json_settings``: ``get_ui_json_settings`` (with 2 s timeout)
+   while device UI is hung, after latencies have been learned.
+ - ``shutdown``: ``on_app_exit`` duration.
+
+Results are written as JSON, e.g.:
+
+    python benchmarks/run_benchmarks.py -o bench_results.json
+
+Plugin runtime dependencies other than MicroDrop, GTK, and the device UI
+(e.g., ``flatland``, ``pandas``, ``psutil``) must be installed.
+
+.. versionadded:: 2.12
+'''
+import argparse
+import imp
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_DIR = os.path.dirname(BENCHMARKS_DIR)
+STANDINS_DIR = os.path.join(BENCHMARKS_DIR, 'standins')
+
+# Stand-ins must take precedence in this process *and* in device UI processes.
+sys.path.insert(0, STANDINS_DIR)
+os.environ['PYTHONPATH'] = os.pathsep.join([STANDINS_DIR] +
+                                           [p for p in [os.environ
+                                                        .get('PYTHONPATH')]
+                                            if p])
+
+import bench_hub  # noqa
+import gobject  # noqa
+from microdrop import app_context, plugin_helpers, plugin_manager  # noqa
+
+
+def summarize(durations_s):
+    '''
+    Returns
+    -------
+    dict
+        Summary statistics (in seconds) of durations.
+    '''
+    durations_s = sorted(durations_s)
+    count = len(durations_s)
+    if not count:
+        return {'count': 0}
+    return {'count': count, 'min_s': durations_s[0],
+            'max_s': durations_s[-1],
+            'mean_s': sum(durations_s) / count,
+            'median_s': durations_s[count // 2],
+            'p90_s': durations_s[min(int(.9 * count), count - 1)]}
+
+
+class PluginBenchmark(object):
+    def __init__(self, plugin_module, timeout_s=30):
+        self.plugin_module = plugin_module
+        self.timeout_s = timeout_s
+        self.plugin = None
+
+    def _finished_timelines(self):
+        return [timeline for timeline in self.plugin.startup_timelines
+                if timeline.finished]
+
+    def _wait_started(self, count):
+        '''
+        Run main loop until ``count`` device UI start ups have finished.
+        '''
+        if not gobject.run_until(lambda: len(self._finished_timelines()) >=
+                                 count, self.timeout_s):
+            raise IOError('Timed out waiting for device UI start up.')
+        timeline = self._finished_timelines()[count - 1]
+        if timeline.error:
+            raise IOError('Device UI start up failed: %s' % timeline.error)
+        return timeline
+
+    def enable(self, app_values=None):
+        plugin_helpers.AppDataController.app_values.clear()
+        self.plugin = self.plugin_module.DmfDeviceUiPlugin()
+        if app_values:
+            self.plugin.set_app_values(app_values)
+        start = time.time()
+        self.plugin.on_plugin_enable()
+        self._wait_started(1)
+        return time.time() - start
+
+    def disable(self):
+        self.plugin.on_plugin_disable()
+        gobject.run_until(lambda: False, .1)
+
+    def cold_start(self, repeat):
+        durations_s = []
+        for i in range(repeat):
+            durations_s.append(self.enable())
+            self.disable()
+        return summarize(durations_s)
+
+    def restart_recovery(self, repeat, warm_standby=False):
+        self.enable({'warm_standby': warm_standby})
+        durations_s = []
+        for i in range(repeat):
+            if warm_standby:
+                # Wait for standby process to finish pre-importing.
+                gobject.run_until(lambda: False, 2.)
+            start = time.time()
+            try:
+                plugin_helpers.hub_execute(self.plugin.name, 'bench_exit')
+            except Exception:
+                pass
+            self._wait_started(i + 2)
+            durations_s.append(time.time() - start)
+        self.disable()
+        return summarize(durations_s)
+
+    def step_run(self, repeat, async_step_video=False, run_length=1):
+        '''
+        Run protocol of ``repeat`` steps, with ``video_enabled`` toggled
+        every ``run_length`` steps.
+        '''
+        self.enable({'async_step_video': async_step_video})
+        app = app_context.get_app()
+        app.protocol = app_context.Protocol([{self.plugin.name:
+                                              {'video_enabled':
+                                               bool((i // run_length) % 2)}}
+                                             for i in range(repeat)])
+        app.running = True
+        durations_s = []
+        try:
+            for i in range(repeat):
+                app.protocol.current_step_number = i
+                del plugin_manager.SIGNALS[:]
+                start = time.time()
+                self.plugin.on_step_run()
+                gobject.run_until(lambda: any(signal == 'on_step_complete'
+                                              for _, signal, _ in
+                                              plugin_manager.SIGNALS),
+                                  self.timeout_s)
+                durations_s.append(time.time() - start)
+        finally:
+            app.running = False
+        if async_step_video:
+            # Let queued toggles drain before stopping device UI.
+            gobject.run_until(lambda: not self.plugin.video_toggler.pending(),
+                              self.timeout_s)
+        self.disable()
+        return summarize(durations_s)
+
+    def settings_round_trips(self, repeat):
+        self.enable()
+        SurfaceAlphas = self.plugin_module.settings.SurfaceAlphas
+
+        get_durations_s = []
+        set_durations_s = []
+        changed_durations_s = []
+        for i in range(repeat):
+            start = time.time()
+            json_settings = self.plugin.get_ui_json_settings()
+            get_durations_s.append(time.time() - start)
+            ui_settings = self.plugin.json_settings_as_python(json_settings)
+            start = time.time()
+            self.plugin.set_ui_settings(ui_settings)
+            set_durations_s.append(time.time() - start)
+            ui_settings['surface_alphas'] = SurfaceAlphas([('layer', i % 2)])
+            start = time.time()
+            self.plugin.set_ui_settings(ui_settings)
+            changed_durations_s.append(time.time() - start)
+        self.disable()
+        return {'get_ui_json_settings': summarize(get_durations_s),
+                'set_ui_settings': summarize(set_durations_s),
+                'set_ui_settings_changed': summarize(changed_durations_s)}
+
+    def profile_switch(self, repeat):
+        '''
+        Alternate between two named settings profiles (different surface
+        alphas and corners).
+        '''
+        self.enable()
+        settings = self.plugin_module.settings
+        for i in range(2):
+            ui_settings = self.plugin.get_ui_settings()
+            ui_settings['surface_alphas'] = \
+                settings.SurfaceAlphas([('layer', i)])
+            ui_settings['df_canvas_corners'] = \
+                settings.Corners([(i, 0), (100, 0), (100, 100), (0, 100)])
+            ui_settings['df_frame_corners'] = \
+                settings.Corners([(0, i), (64, 0), (64, 48), (0, 48)])
+            self.plugin.set_ui_settings(ui_settings, default_corners=True)
+            self.plugin.save_ui_profile('profile-%d' % i,
+                                        device_id='camera-%d' % i)
+        durations_s = []
+        for i in range(repeat):
+            start = time.time()
+            self.plugin.apply_ui_profile(device_id='camera-%d' % (i % 2))
+            durations_s.append(time.time() - start)
+        self.disable()
+        return summarize(durations_s)
+
+    def save_settings(self, repeat):
+        '''
+        Save settings ``repeat`` times in quick succession, with only surface
+        alphas changed each time.
+
+        Returns
+        -------
+        dict
+            Duration of each save, and number of app value writes and of
+            keys written.
+        '''
+        self.enable({'autosave_interval_s': 0})
+        json_settings = self.plugin.get_ui_json_settings()
+        del plugin_helpers.APP_VALUE_WRITES[:]
+        durations_s = []
+        for i in range(repeat):
+            json_settings['surface_alphas'] = '{"layer":%d}' % (i % 2)
+            start = time.time()
+            self.plugin.save_ui_settings(dict(json_settings))
+            durations_s.append(time.time() - start)
+        self.disable()
+        writes = plugin_helpers.APP_VALUE_WRITES
+        result = summarize(durations_s)
+        result.update({'app_value_writes': len(writes),
+                       'app_value_keys_written': sum(map(len, writes))})
+        return result
+
+    def hung_settings(self, repeat):
+        self.enable()
+        for i in range(20):
+            self.plugin.get_ui_json_settings()
+        durations_s = []
+        for i in range(repeat):
+            try:
+                plugin_helpers.hub_execute(self.plugin.name, 'bench_hang',
+                                           duration_s=2.5, timeout_s=.01)
+            except IOError:
+                pass
+            start = time.time()
+            self.plugin.get_ui_json_settings(timeout_s=2)
+            durations_s.append(time.time() - start)
+            # Wait for device UI to recover.
+            gobject.run_until(lambda: False, 2.6 - durations_s[-1])
+            self.plugin.get_ui_json_settings()
+        self.disable()
+        return summarize(durations_s)
+
+    def shutdown(self, repeat, autosave_interval_s=3):
+        durations_s = []
+        for i in range(repeat):
+            self.enable({'autosave_interval_s': autosave_interval_s})
+            start = time.time()
+            self.plugin.on_app_exit()
+            durations_s.append(time.time() - start)
+        return summarize(durations_s)
+
+
+def load_plugin():
+    '''
+    Import plugin package from plugin directory.
+    '''
+    return imp.load_module('dmf_device_ui_plugin', None, PLUGIN_DIR,
+                           ('', '', imp.PKG_DIRECTORY))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-o', '--output', default='bench_results.json',
+                        help='Output JSON file (default: %(default)s).')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Repetitions of start up and shut down '
+                        'benchmarks (default: %(default)s).')
+    parser.add_argument('-s', '--step-repeat', type=int, default=200,
+                        help='Repetitions of step and settings benchmarks '
+                        '(default: %(default)s).')
+    parser.add_argument('--latency-s', type=float, default=0,
+                        help='Simulated device UI command latency.')
+    parser.add_argument('--connect-s', type=float, default=0,
+                        help='Simulated device UI start up duration before '
+                        'connecting to hub.')
+    parser.add_argument('--import-s', type=float, default=0,
+                        help='Simulated device UI module import duration.')
+    parser.add_argument('--video-config-s', type=float, default=0,
+                        help='Simulated duration to apply video config.')
+    parser.add_argument('--legacy-ui', action='store_true',
+                        help='Do not support optional batched commands in '
+                        'fake device UI.')
+    parser.add_argument('--no-codec', action='store_true',
+                        help='Do not support plugin wire format in fake '
+                        'device UI.')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else
+                        logging.ERROR)
+    for name in ('latency', 'connect', 'import', 'video_config'):
+        os.environ['DMF_DEVICE_UI_BENCH_%s_S' % name.upper()] = \
+            str(getattr(args, '%s_s' % name))
+    os.environ['DMF_DEVICE_UI_BENCH_LEGACY'] = '1' if args.legacy_ui else ''
+    os.environ['DMF_DEVICE_UI_BENCH_CODEC'] = \
+        '' if args.no_codec else os.path.join(PLUGIN_DIR, 'codec.py')
+
+    bench_hub.HUB = bench_hub.LocalHub()
+    bench_hub.HUB.local_handlers[('microdrop.command_plugin',
+                                  'get_commands')] = lambda **kwargs: {}
+    benchmark = PluginBenchmark(load_plugin())
+
+    results = {}
+    results['cold_start'] = benchmark.cold_start(args.repeat)
+    results['restart_recovery'] = benchmark.restart_recovery(args.repeat)
+    results['restart_recovery_warm_standby'] = \
+        benchmark.restart_recovery(args.repeat, warm_standby=True)
+    results['step_run'] = benchmark.step_run(args.step_repeat)
+    results['step_run_async_video'] = \
+        benchmark.step_run(args.step_repeat, async_step_video=True)
+    results['step_run_video_runs'] = benchmark.step_run(args.step_repeat,
+                                                        run_length=50)
+    results.update(benchmark.settings_round_trips(args.step_repeat))
+    results['save_ui_settings'] = benchmark.save_settings(args.step_repeat)
+    results['profile_switch'] = benchmark.profile_switch(args.step_repeat)
+    results['hung_get_ui_json_settings'] = \
+        benchmark.hung_settings(args.repeat)
+    results['shutdown'] = benchmark.shutdown(args.repeat)
+    results['shutdown_no_autosave'] = benchmark.shutdown(args.repeat, 0)
+
+    output = {'timestamp': time.time(),
+              'python': sys.version, 'platform': platform.platform(),
+              'parameters': dict([(k, getattr(args, k))
+                                  for k in ('repeat', 'step_repeat',
+                                            'latency_s', 'connect_s',
+                                            'import_s', 'video_config_s',
+                                            'legacy_ui', 'no_codec')]),
+              'results': results,
+              # Device UI command latencies of plugin used for last benchmark.
+              'rpc_stats': benchmark.plugin.get_rpc_stats()}
+    with open(args.output, 'w') as output_file:
+        json.dump(output, output_file, indent=2, sort_keys=True)
+
+    for name, result in sorted(results.items()):
+        if result.get('count'):
+            print('%-32s median: %8.2f ms  p90: %8.2f ms  (n=%d)' %
+                  (name, 1e3 * result['median_s'], 1e3 * result['p90_s'],
+                   result['count']))
+    bench_hub.HUB.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+'''
+Local stand-in for the MicroDrop ZeroMQ hub.
+
+Plugins (e.g., the fake device UI process) connect to the hub using
+:class:`HubClient` and register a name.  Commands are sent to a registered
+plugin using :meth:`LocalHub.execute`, which mirrors the signature of
+:func:`microdrop.plugin_helpers.hub_execute`.
+
+Messages are exchanged using :mod:`multiprocessing.connection`, so no
+third-party packages are required.
+
+.. versionadded:: 2.12
+'''
+from multiprocessing.connection import Client, Listener
+import itertools
+import logging
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+AUTHKEY = b'dmf-device-ui-bench'
+
+#: Hub used by stand-in :func:`microdrop.plugin_helpers.hub_execute`.
+HUB = None
+
+
+def parse_uri(uri):
+    '''
+    Parameters
+    ----------
+    uri : str
+        Hub URI, e.g., ``tcp://127.0.0.1:31000``.
+
+    Returns
+    -------
+    tuple
+        ``(host, port)`` address.
+    '''
+    host, port = uri.split('://', 1)[-1].rsplit(':', 1)
+    return host, int(port)
+
+
+class LocalHub(object):
+    '''
+    Route commands to plugins registered through :class:`HubClient`.
+    '''
+    def __init__(self):
+        self.listener = Listener(('127.0.0.1', 0), authkey=AUTHKEY)
+        self.uri = 'tcp://%s:%d' % self.listener.address
+        #: Local command handlers, keyed by ``(target, command)``.
+        self.local_handlers = {}
+        self._clients = {}
+        self._pending = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except Exception:
+                return
+            message = connection.recv()
+            name = message[1]
+            self._clients[name] = connection
+            thread = threading.Thread(target=self._read,
+                                      args=(name, connection))
+            thread.daemon = True
+            thread.start()
+
+    def _read(self, name, connection):
+        while True:
+            try:
+                request_id, error, result = connection.recv()
+            except (EOFError, IOError, OSError):
+                if self._clients.get(name) is connection:
+                    del self._clients[name]
+                return
+            pending = self._pending.pop(request_id, None)
+            if pending is not None:
+                pending[1:] = [error, result]
+                pending[0].set()
+
+    def execute(self, target, command, timeout_s=10, silent=False,
+                **kwargs):
+        '''
+        Execute command on registered plugin and return result.
+
+        Raises
+        ------
+        IOError
+            If target is not registered or does not respond within
+            ``timeout_s``.
+        RuntimeError
+            If command raised an exception.
+        '''
+        if (target, command) in self.local_handlers:
+            return self.local_handlers[(target, command)](**kwargs)
+        connection = self._clients.get(target)
+        if connection is None:
+            raise IOError('Plugin `%s` is not registered with hub.' % target)
+        request_id = next(self._ids)
+        pending = [threading.Event(), None, None]
+        self._pending[request_id] = pending
+        with self._lock:
+            connection.send((request_id, command, kwargs))
+        # Wait in short slices; in Python 2, `Event.wait(timeout)` polls with
+        # sleeps of up to 50 ms, which would swamp simulated latencies.
+        deadline = time.time() + timeout_s
+        while not pending[0].is_set() and time.time() < deadline:
+            pending[0].wait(min(max(deadline - time.time(), 0), .005))
+        if not pending[0].is_set():
+            self._pending.pop(request_id, None)
+            raise IOError('Timed out after %ss waiting for `%s.%s`.' %
+                          (timeout_s, target, command))
+        if pending[1] is not None:
+            raise RuntimeError(pending[1])
+        return pending[2]
+
+    def close(self):
+        self.listener.close()
+
+
+class HubClient(object):
+    '''
+    Register with hub and serve commands using handler functions.
+
+    Parameters
+    ----------
+    uri : str
+        Hub URI.
+    name : str
+        Name to register with hub.
+    handlers : dict
+        Command handler functions, keyed by command name.
+    '''
+    def __init__(self, uri, name, handlers):
+        self.name = name
+        self.handlers = handlers
+        self.connection = Client(parse_uri(uri), authkey=AUTHKEY)
+        self.connection.send(('register', name))
+
+    def serve_forever(self):
+        while True:
+            try:
+                request_id, command, kwargs = self.connection.recv()
+            except (EOFError, IOError, OSError):
+                return
+            if command not in self.handlers:
+                # Reply as ZeroMQ plugins do to commands they do not
+                # implement.
+                self.connection.send((request_id, 'NameError: Unrecognized '
+                                      'command: %s' % command, None))
+                continue
+            try:
+                result = self.handlers[command](**kwargs)
+            except Exception:
+                self.connection.send((request_id, traceback.format_exc(),
+                                      None))
+            else:
+                self.connection.send((request_id, None, result))
@@ -0,0 +1,13 @@
+'''
+Fake DMF device UI for benchmarks.
+
+Simulates import duration of device UI dependencies (e.g., ``gtk``,
+``pandas``) according to ``DMF_DEVICE_UI_BENCH_IMPORT_S`` environment
+variable.
+
+.. versionadded:: 2.12
+'''
+import os
+import time
+
+time.sleep(float(os.environ.get('DMF_DEVICE_UI_BENCH_IMPORT_S', 0)))
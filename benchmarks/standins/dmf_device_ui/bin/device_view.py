@@ -0,0 +1,178 @@
+'''
+Fake DMF device UI process.
+
+Registers with the local benchmark hub (see :mod:`bench_hub`) and serves the
+device UI commands used by the DMF device UI plugin, without a display or a
+camera.
+
+Simulated delays (in seconds) are read from environment variables:
+
+ - ``DMF_DEVICE_UI_BENCH_IMPORT_S``: module import (e.g., ``gtk``, ``pandas``).
+ - ``DMF_DEVICE_UI_BENCH_CONNECT_S``: start up before connecting to hub.
+ - ``DMF_DEVICE_UI_BENCH_LATENCY_S``: handling of each command.
+ - ``DMF_DEVICE_UI_BENCH_VIDEO_CONFIG_S``: applying video config (e.g.,
+   opening camera).
+
+If ``DMF_DEVICE_UI_BENCH_LEGACY`` environment variable is set to a non-empty
+value, optional batched commands (e.g., ``get_ui_state`` and
+``apply_ui_settings``) are not supported.
+
+The plugin wire format (see ``codec.py`` in the plugin) is supported if
+``DMF_DEVICE_UI_BENCH_CODEC`` is set to the path of the plugin ``codec.py``.
+
+.. versionadded:: 2.12
+'''
+import imp
+import os
+import sys
+import threading
+import time
+
+# Settings are exchanged with the plugin as `pandas` objects.
+import pandas  # noqa
+
+import bench_hub
+
+
+def _load_codec():
+    codec_path = os.environ.get('DMF_DEVICE_UI_BENCH_CODEC')
+    if codec_path:
+        return imp.load_source('_dmf_device_ui_codec', codec_path)
+
+
+def _delay_s(name):
+    return float(os.environ.get('DMF_DEVICE_UI_BENCH_%s_S' % name, 0))
+
+
+class FakeDeviceUi(object):
+    def __init__(self, allocation):
+        self.allocation = allocation
+        self.video_config = None
+        self.surface_alphas = None
+        self.df_canvas_corners = None
+        self.df_frame_corners = None
+        self.video_enabled = True
+        self.codec = _load_codec()
+
+    def handlers(self):
+        latency_s = _delay_s('LATENCY')
+
+        def _delayed(func):
+            def _wrapped(**kwargs):
+                time.sleep(latency_s)
+                return func(**kwargs)
+            return _wrapped
+
+        commands = ['ping', 'get_video_config', 'set_video_config',
+                    'get_surface_alphas', 'set_surface_alphas', 'get_corners',
+                    'set_corners', 'set_default_corners', 'enable_video',
+                    'disable_video', 'bench_exit', 'bench_hang']
+        if not os.environ.get('DMF_DEVICE_UI_BENCH_LEGACY'):
+            commands += ['get_ui_state', 'apply_ui_settings']
+            if self.codec is not None:
+                commands += ['get_wire_formats']
+        return dict([(name, _delayed(getattr(self, name)))
+                     for name in commands])
+
+    def ping(self):
+        return 'pong'
+
+    def get_video_config(self):
+        return self.video_config
+
+    def set_video_config(self, video_config):
+        time.sleep(_delay_s('VIDEO_CONFIG'))
+        self.video_config = (video_config if video_config is not None and
+                             len(video_config) else None)
+
+    def get_surface_alphas(self):
+        return self.surface_alphas
+
+    def set_surface_alphas(self, surface_alphas):
+        self.surface_alphas = surface_alphas
+
+    def get_corners(self):
+        data = {'allocation': dict(self.allocation)}
+        for k in ('df_canvas_corners', 'df_frame_corners'):
+            if getattr(self, k) is not None:
+                data[k] = getattr(self, k)
+        return data
+
+    def set_corners(self, df_canvas_corners, df_frame_corners):
+        self.df_canvas_corners = df_canvas_corners
+        self.df_frame_corners = df_frame_corners
+
+    def set_default_corners(self, canvas, frame):
+        self.set_corners(canvas, frame)
+
+    def get_wire_formats(self):
+        return [self.codec.WIRE_FORMAT]
+
+    def get_ui_state(self, fields, encoding=None):
+        state = {'errors': {}}
+        for field in fields:
+            try:
+                value = getattr(self, 'get_' + field)()
+                if encoding and field == 'corners':
+                    for k in ('df_canvas_corners', 'df_frame_corners'):
+                        if k in value:
+                            value[k] = self.codec.encode(value[k])
+                elif encoding:
+                    value = self.codec.encode(value)
+                state[field] = value
+            except Exception as exception:
+                state['errors'][field] = str(exception)
+        return state
+
+    def apply_ui_settings(self, settings, default_corners=False,
+                          encoding=None):
+        if encoding:
+            settings = dict([(k, self.codec.decode(v))
+                             for k, v in settings.items()])
+        if 'video_config' in settings:
+            self.set_video_config(settings['video_config'])
+        if 'surface_alphas' in settings:
+            self.set_surface_alphas(settings['surface_alphas'])
+        if 'df_canvas_corners' in settings:
+            self.set_corners(settings['df_canvas_corners'],
+                             settings['df_frame_corners'])
+
+    def enable_video(self):
+        self.video_enabled = True
+
+    def disable_video(self):
+        self.video_enabled = False
+
+    def bench_hang(self, duration_s):
+        # Block command handling (e.g., as if GTK main loop was stuck).
+        time.sleep(duration_s)
+
+    def bench_exit(self, returncode=0):
+        # Exit (e.g., as if window was closed) after responding.
+        threading.Timer(.01, os._exit, args=(returncode, )).start()
+
+
+def parse_args(args):
+    '''
+    Parse ``-n <name> [-a <allocation JSON>] [-d] fixed <hub URI>``.
+    '''
+    import json
+
+    name = args[args.index('-n') + 1]
+    allocation = (json.loads(args[args.index('-a') + 1])
+                  if '-a' in args else {})
+    allocation = dict([(k, allocation.get(k))
+                       for k in ('x', 'y', 'width', 'height')])
+    return name, allocation, args[-1]
+
+
+def main(args):
+    name, allocation, hub_uri = parse_args(args)
+    time.sleep(_delay_s('CONNECT'))
+    device_ui = FakeDeviceUi(allocation)
+    client = bench_hub.HubClient(hub_uri, name, device_ui.handlers())
+    client.serve_forever()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+'''
+Headless stand-in for the :mod:`gobject` main loop.
+
+Callbacks scheduled from any thread are run in the thread calling
+:func:`iteration` (i.e., the benchmark "main loop" thread).
+
+.. versionadded:: 2.12
+'''
+import itertools
+import threading
+import time
+
+_condition = threading.Condition()
+_ids = itertools.count(1)
+# Scheduled sources as `{source_id: (due_time, interval_s, func, args)}`.
+_sources = {}
+
+
+def timeout_add(interval_ms, func, *args):
+    with _condition:
+        source_id = next(_ids)
+        _sources[source_id] = (time.time() + 1e-3 * interval_ms,
+                               1e-3 * interval_ms, func, args)
+        _condition.notify()
+    return source_id
+
+
+def idle_add(func, *args):
+    return timeout_add(0, func, *args)
+
+
+def source_remove(source_id):
+    with _condition:
+        return _sources.pop(source_id, None) is not None
+
+
+def iteration(block=True, timeout_s=.01):
+    '''
+    Run callbacks that are due.
+
+    Parameters
+    ----------
+    block : bool, optional
+        If ``True``, wait up to ``timeout_s`` for a callback to become due.
+
+    Returns
+    -------
+    bool
+        ``True`` if any callback was run.
+    '''
+    with _condition:
+        now = time.time()
+        due = sorted((source[0], source_id) for source_id, source in
+                     _sources.items() if source[0] <= now)
+        if not due and block:
+            _condition.wait(timeout_s)
+            now = time.time()
+            due = sorted((source[0], source_id) for source_id, source in
+                         _sources.items() if source[0] <= now)
+        callbacks = [(source_id, _sources.pop(source_id))
+                     for _, source_id in due]
+    for source_id, (due_time, interval_s, func, args) in callbacks:
+        if func(*args) and interval_s > 0:
+            with _condition:
+                _sources[source_id] = (time.time() + interval_s, interval_s,
+                                       func, args)
+    return bool(callbacks)
+
+
+def run_until(predicate, timeout_s):
+    '''
+    Run main loop until ``predicate()`` is true or ``timeout_s`` elapses.
+
+    Returns
+    -------
+    bool
+        Final value of ``predicate()``.
+    '''
+    deadline = time.time() + timeout_s
+    while not predicate() and time.time() < deadline:
+        iteration(timeout_s=min(.01, max(deadline - time.time(), 0)))
+    return bool(predicate())
@@ -0,0 +1,11 @@
+'''
+Headless stand-in for :mod:`gtk`.
+
+.. versionadded:: 2.12
+'''
+
+
+class gdk(object):
+    @staticmethod
+    def threads_init():
+        pass
@@ -0,0 +1,8 @@
+'''
+Stand-in for the parts of the MicroDrop API used by the DMF device UI plugin.
+
+Commands are routed through :data:`bench_hub.HUB`, and app and step options
+are kept in memory.
+
+.. versionadded:: 2.12
+'''
@@ -0,0 +1,37 @@
+import bench_hub
+
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+SCREEN_TOP = 0
+TITLEBAR_HEIGHT = 24
+
+
+class Config(object):
+    def __init__(self):
+        self.data = {}
+
+
+class Protocol(object):
+    def __init__(self, steps=None):
+        #: Step options of each step, keyed by plugin name.
+        self.steps = steps or [{}]
+        self.current_step_number = 0
+
+
+class App(object):
+    def __init__(self):
+        self.config = Config()
+        self.protocol = Protocol()
+        self.realtime_mode = False
+        self.running = False
+
+
+APP = App()
+
+
+def get_app():
+    return APP
+
+
+def get_hub_uri():
+    return bench_hub.HUB.uri
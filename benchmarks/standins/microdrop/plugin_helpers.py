@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+import bench_hub
+from .app_context import get_app
+
+PluginMetadata = namedtuple('PluginMetadata', 'package_name plugin_name '
+                            'version versioned_name')
+
+#: App values written through :meth:`AppDataController.set_app_values`.
+APP_VALUE_WRITES = []
+
+
+def get_plugin_info(plugin_root):
+    return PluginMetadata('microdrop.dmf-device-ui-plugin',
+                          'dmf_device_ui_plugin', '0+bench',
+                          'dmf_device_ui_plugin-0+bench')
+
+
+def hub_execute(*args, **kwargs):
+    return bench_hub.HUB.execute(*args, **kwargs)
+
+
+class AppDataController(object):
+    #: App values, keyed by plugin name.
+    app_values = {}
+
+    def get_default_app_options(self):
+        return dict([(k, v.value) for k, v in
+                     self.AppFields.from_defaults().iteritems()])
+
+    def get_app_values(self):
+        values = self.get_default_app_options()
+        values.update(self.app_values.get(self.name, {}))
+        return values
+
+    def set_app_values(self, values_dict):
+        APP_VALUE_WRITES.append(dict(values_dict))
+        self.app_values.setdefault(self.name, {}).update(values_dict)
+
+    def on_plugin_enable(self):
+        pass
+
+
+class StepOptionsController(object):
+    def get_default_step_options(self):
+        return dict([(k, v.value) for k, v in
+                     self.StepFields.from_defaults().iteritems()])
+
+    def get_step_options(self, step_number=None):
+        protocol = get_app().protocol
+        if step_number is None:
+            step_number = protocol.current_step_number
+        options = self.get_default_step_options()
+        options.update(protocol.steps[step_number].get(self.name, {}))
+        return options
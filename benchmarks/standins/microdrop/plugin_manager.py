@@ -0,0 +1,35 @@
+from collections import namedtuple
+import time
+
+#: Emitted signals as ``(timestamp, signal, args)`` tuples.
+SIGNALS = []
+
+ScheduleRequest = namedtuple('ScheduleRequest', 'before after')
+
+
+class IPlugin(object):
+    pass
+
+
+class Plugin(object):
+    pass
+
+
+class _PluginGlobals(object):
+    def push_env(self, name):
+        pass
+
+    def pop_env(self):
+        pass
+
+
+PluginGlobals = _PluginGlobals()
+
+
+def implements(*args):
+    pass
+
+
+def emit_signal(signal, args=None, interface=None):
+    SIGNALS.append((time.time(), signal, args))
+    return {}
@@ -0,0 +1,5 @@
+'''
+Headless stand-in for :mod:`pygtkhelpers`.
+
+.. versionadded:: 2.12
+'''
@@ -0,0 +1,12 @@
+from functools import wraps
+
+import gobject
+
+
+def gtk_threadsafe(func):
+    @wraps(func)
+    def _gtk_threadsafe(*args):
+        def _no_return_func(*args):
+            func(*args)
+        gobject.idle_add(_no_return_func, *args)
+    return _gtk_threadsafe
@@ -0,0 +1,5 @@
+import gobject
+
+
+def refresh_gui(delay=0.0001, wait=0.0001):
+    gobject.iteration(block=False)
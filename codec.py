@@ -0,0 +1,205 @@
+'''
+Compact wire format for device UI settings exchanged through the hub.
+
+Corner data frames and numeric series (e.g., surface alphas) are encoded as a
+small header, JSON labels, and a raw little-endian ``float64`` array.  Other
+series (e.g., video config) are encoded as JSON.  Encoded values are ASCII
+(base64) strings, so they pass through any hub serializer unchanged and do not
+depend on compatible :mod:`pandas` versions in the plugin and device UI
+processes.
+
+This module only depends on the standard library (except for :func:`encode`
+and :func:`decode`, which convert :mod:`pandas` objects), so the device UI
+can share the same implementation.
+
+.. versionadded:: 2.12
+'''
+from collections import OrderedDict
+import base64
+import json
+import struct
+
+#: Name of wire format, negotiated with device UI (see ``get_wire_formats``).
+WIRE_FORMAT = 'binary-v1'
+
+# Header: magic, version, kind, row count, column count, labels size.
+_HEADER = struct.Struct('<2sBcHHH')
+_MAGIC = b'UI'
+_VERSION = 1
+KIND_NONE = b'N'
+KIND_FRAME = b'F'
+KIND_SERIES = b'S'
+KIND_JSON = b'J'
+
+
+def _pack(kind, values=(), rows=0, cols=0, labels=None, body=b''):
+    labels = (json.dumps(labels, separators=(',', ':')).encode('utf8')
+              if labels is not None else b'')
+    return base64.b64encode(_HEADER.pack(_MAGIC, _VERSION, kind, rows, cols,
+                                         len(labels)) + labels +
+                            struct.pack('<%dd' % len(values), *values) +
+                            body)
+
+
+def pack_frame(rows, index, columns, index_name=None):
+    '''
+    Parameters
+    ----------
+    rows : list
+        Rows of numeric values.
+    index : list
+        Row labels.
+    columns : list
+        Column labels.
+
+    Returns
+    -------
+    str
+        Encoded numeric data frame.
+    '''
+    return _pack(KIND_FRAME, [float(v) for row in rows for v in row],
+                 len(rows), len(columns),
+                 {'index': list(index), 'index_name': index_name,
+                  'columns': list(columns)})
+
+
+def pack_series(values, index, name=None):
+    '''
+    Returns
+    -------
+    str
+        Encoded numeric series.
+    '''
+    return _pack(KIND_SERIES, [float(v) for v in values], len(values), 1,
+                 {'index': list(index), 'name': name})
+
+
+def pack_json(text):
+    '''
+    Parameters
+    ----------
+    text : str
+        JSON object (e.g., mixed-type series).
+
+    Returns
+    -------
+    str
+        Encoded JSON object.
+    '''
+    return _pack(KIND_JSON, body=text.encode('utf8'))
+
+
+def pack_none():
+    return _pack(KIND_NONE)
+
+
+def unpack(data):
+    '''
+    Parameters
+    ----------
+    data : str
+        Encoded value.
+
+    Returns
+    -------
+    tuple
+        ``(kind, labels, values)``, where ``kind`` is one of ``KIND_*``;
+        ``labels`` is a ``dict`` of labels (frame and series only); and
+        ``values`` is a list of rows (frame), a list of values (series), an
+        ordered ``dict`` (JSON), or ``None``.
+
+    Raises
+    ------
+    ValueError
+        If data is not in a supported format.
+    '''
+    raw = base64.b64decode(data)
+    magic, version, kind, rows, cols, labels_size = \
+        _HEADER.unpack_from(raw)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError('Unsupported encoding.')
+    offset = _HEADER.size
+    if kind == KIND_NONE:
+        return kind, None, None
+    elif kind == KIND_JSON:
+        return kind, None, json.loads(raw[offset:].decode('utf8'),
+                                      object_pairs_hook=OrderedDict)
+    labels = json.loads(raw[offset:offset + labels_size].decode('utf8'))
+    offset += labels_size
+    values = struct.unpack_from('<%dd' % (rows * cols), raw, offset)
+    if kind == KIND_FRAME:
+        return kind, labels, [list(values[i * cols:(i + 1) * cols])
+                              for i in range(rows)]
+    elif kind == KIND_SERIES:
+        return kind, labels, list(values)
+    raise ValueError('Unsupported encoding kind `%s`.' % kind)
+
+
+def _is_numeric(values):
+    return getattr(values, 'dtype', None) is not None and \
+        values.dtype.kind in 'biuf'
+
+
+def encode(value):
+    '''
+    Parameters
+    ----------
+    value : pandas.DataFrame, pandas.Series, or None
+        Numeric data frame (e.g., corners), series, or ``None``.
+
+    Returns
+    -------
+    str
+        Encoded value (ASCII).
+
+    Raises
+    ------
+    TypeError
+        If value type is not supported.
+    '''
+    if value is None:
+        return pack_none()
+    elif hasattr(value, 'columns'):
+        if not all(_is_numeric(value[c]) for c in value.columns):
+            raise TypeError('Only numeric data frames are supported.')
+        return pack_frame(value.values.tolist(), value.index.tolist(),
+                          value.columns.tolist(), value.index.name)
+    elif hasattr(value, 'index'):
+        if _is_numeric(value):
+            return pack_series(value.tolist(), value.index.tolist(),
+                               value.name)
+        # Mixed types (e.g., video config); keep order of entries.
+        return pack_json(value.to_json())
+    raise TypeError('Cannot encode `%s`.' % type(value))
+
+
+def decode(data):
+    '''
+    Parameters
+    ----------
+    data : str
+        Value encoded by :func:`encode`.
+
+    Returns
+    -------
+    pandas.DataFrame, pandas.Series, or None
+        Decoded value.
+
+    Raises
+    ------
+    ValueError
+        If data is not in a supported format.
+    '''
+    import pandas as pd
+
+    kind, labels, values = unpack(data)
+    if kind == KIND_NONE:
+        return None
+    elif kind == KIND_JSON:
+        return pd.Series(values)
+    elif kind == KIND_FRAME:
+        index = pd.Index(labels['index'], name=labels['index_name'])
+        return pd.DataFrame(values, index=index, columns=labels['columns'],
+                            dtype=float)
+    return pd.Series(values, index=labels['index'], name=labels['name'],
+                     dtype=float)
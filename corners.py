@@ -0,0 +1,146 @@
+'''
+Compact storage of canvas and frame corners in app values.
+
+Corners are stored as four ``(x, y)`` points packed as eight little-endian
+``float64`` values and base64 encoded, with a ``corners-v1:`` prefix, e.g.::
+
+    corners-v1:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAICEQA...
+
+Corners were previously stored as CSV (i.e., ``DataFrame.to_csv()``).  CSV
+values with the same layout (unnamed index ``0`` to ``3``, columns ``x`` and
+``y``) are decoded without :mod:`pandas` and may be migrated using
+:func:`migrate_corners`.
+
+.. versionadded:: 2.12
+'''
+import base64
+import binascii
+import csv
+import struct
+
+PREFIX = 'corners-v1:'
+#: Columns of corners data frames.
+COLUMNS = ('x', 'y')
+#: Number of corners.
+POINT_COUNT = 4
+#: App value keys of corners.
+CORNERS_KEYS = ('canvas_corners', 'frame_corners')
+
+_STRUCT = struct.Struct('<%dd' % (2 * POINT_COUNT))
+
+
+def pack_corners(points):
+    '''
+    Parameters
+    ----------
+    points : list
+        Four ``(x, y)`` points.
+
+    Returns
+    -------
+    str
+        Compact encoding of corners.
+    '''
+    data = _STRUCT.pack(*[float(v) for point in points for v in point])
+    return PREFIX + base64.b64encode(data).decode('ascii')
+
+
+def _parse_csv(text):
+    # Skip blank lines (as `pandas.read_csv` does).
+    rows = [row for row in csv.reader(text.splitlines()) if row]
+    if (not rows or rows[0][0].strip() or
+            [c.strip() for c in rows[0][1:]] != list(COLUMNS)):
+        # Named index or unexpected columns.
+        raise ValueError('Unexpected corners columns.')
+    rows = rows[1:]
+    if [row[0].strip() for row in rows] != [str(i) for i in
+                                            range(POINT_COUNT)]:
+        raise ValueError('Unexpected corners index.')
+    points = [tuple(float(v) for v in row[1:]) for row in rows]
+    if any(len(p) != 2 for p in points):
+        raise ValueError('Unexpected corners values.')
+    return points
+
+
+def parse_corners(text):
+    '''
+    Parameters
+    ----------
+    text : str
+        Corners in compact encoding (see :func:`pack_corners`) or CSV.
+
+    Returns
+    -------
+    list
+        Four ``(x, y)`` points.
+
+    Raises
+    ------
+    ValueError
+        If corners are not in the expected layout.
+    '''
+    if text.startswith(PREFIX):
+        try:
+            values = _STRUCT.unpack(base64.b64decode(text[len(PREFIX):]))
+        except (TypeError, binascii.Error, struct.error) as exception:
+            raise ValueError('Invalid corners: %s' % exception)
+        return list(zip(values[::2], values[1::2]))
+    return _parse_csv(text)
+
+
+def is_corners_frame(df):
+    '''
+    Returns
+    -------
+    bool
+        ``True`` if data frame has the layout of corners (i.e., columns ``x``
+        and ``y``, and four rows indexed ``0`` to ``3``).
+    '''
+    return (tuple(df.columns) == COLUMNS and
+            list(df.index) == list(range(POINT_COUNT)) and
+            df.index.name is None)
+
+
+def corners_as_text(df):
+    '''
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Corners.
+
+    Returns
+    -------
+    str
+        Compact encoding of corners, or CSV if data frame does not have the
+        layout of corners.
+    '''
+    if is_corners_frame(df):
+        try:
+            return pack_corners(df.values.tolist())
+        except (TypeError, ValueError, struct.error):
+            pass
+    return df.to_csv()
+
+
+def migrate_corners(app_values):
+    '''
+    Parameters
+    ----------
+    app_values : dict
+        App values.
+
+    Returns
+    -------
+    dict
+        CSV corners app values that can be stored in compact encoding,
+        converted to compact encoding.
+    '''
+    migrated = {}
+    for k in CORNERS_KEYS:
+        value = app_values.get(k)
+        if value and not value.startswith(PREFIX):
+            try:
+                migrated[k] = pack_corners(_parse_csv(value))
+            except (ValueError, struct.error):
+                pass
+    return migrated
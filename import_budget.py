@@ -0,0 +1,135 @@
+'''
+Report import time of each plugin module dependency and check it against an
+import-time budget.
+
+Top-level (i.e., eager) imports are read from the plugin module source (and
+from the source of plugin submodules it imports), so the report stays in sync
+with the plugin module.  Imports are timed in a fresh Python interpreter, in
+the order they appear in the plugin module.  The time reported for each
+dependency therefore includes any of *its* dependencies not already imported
+by a previous dependency.
+
+Example
+-------
+
+    python import_budget.py --budget-ms 500
+
+.. versionadded:: 2.12
+'''
+from subprocess import check_output
+import argparse
+import ast
+import json
+import os
+import sys
+
+#: Default import-time budget for eager plugin dependencies (milliseconds).
+DEFAULT_BUDGET_MS = 500
+
+# Script run in a fresh interpreter to time each import.
+_TIMER_SCRIPT = '''
+import json
+import sys
+import time
+
+results = []
+for module_name in json.loads(sys.argv[1]):
+    start = time.time()
+    try:
+        __import__(module_name)
+    except Exception as exception:
+        error = '%s: %s' % (type(exception).__name__, exception)
+    else:
+        error = None
+    results.append({'module': module_name, 'error': error,
+                    'duration_ms': 1e3 * (time.time() - start)})
+sys.stdout.write(json.dumps(results))
+'''
+
+
+def eager_imports(source_path):
+    '''
+    Parameters
+    ----------
+    source_path : str
+        Path to Python module source.
+
+    Returns
+    -------
+    list
+        Names of absolute modules imported at the top level of the module, in
+        order of appearance.  Top-level imports of sibling modules imported
+        using relative imports (e.g., ``from .foo import bar``) are included.
+    '''
+    with open(source_path, 'r') as input_:
+        tree = ast.parse(input_.read(), source_path)
+
+    module_names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names = [node.module]
+        elif isinstance(node, ast.ImportFrom) and node.level == 1:
+            sibling_path = os.path.join(os.path.dirname(source_path),
+                                        '%s.py' % node.module)
+            names = (eager_imports(sibling_path)
+                     if os.path.isfile(sibling_path) else [])
+        else:
+            continue
+        module_names.extend(name for name in names
+                            if name not in module_names)
+    return module_names
+
+
+def measure_imports(module_names, python_exe=None):
+    '''
+    Time import of each module in a fresh Python interpreter.
+
+    Parameters
+    ----------
+    module_names : list
+        Names of modules to import, in order.
+    python_exe : str, optional
+        Python interpreter to use (default: :data:`sys.executable`).
+
+    Returns
+    -------
+    list
+        One ``dict`` per module with ``module``, ``duration_ms``, and
+        ``error`` (``None`` if the module was imported successfully) keys.
+    '''
+    output = check_output([python_exe or sys.executable, '-c', _TIMER_SCRIPT,
+                           json.dumps(module_names)])
+    return json.loads(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Import-time budget for eager plugin '
+                        'dependencies (default: %(default)s ms).')
+    parser.add_argument('--json', action='store_true', help='Write report '
+                        'as JSON.')
+    args = parser.parse_args(argv)
+
+    source_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '__init__.py')
+    results = measure_imports(eager_imports(source_path))
+    total_ms = sum(result['duration_ms'] for result in results)
+
+    if args.json:
+        print(json.dumps({'budget_ms': args.budget_ms, 'total_ms': total_ms,
+                          'imports': results}, indent=2))
+    else:
+        for result in sorted(results, key=lambda x: -x['duration_ms']):
+            print('%8.1f ms  %s%s' % (result['duration_ms'], result['module'],
+                                      ' (%s)' % result['error']
+                                      if result['error'] else ''))
+        print('%8.1f ms  TOTAL (budget: %.1f ms)' % (total_ms,
+                                                     args.budget_ms))
+    return 0 if total_ms <= args.budget_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
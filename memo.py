@@ -0,0 +1,50 @@
+'''
+Bounded memo cache.
+
+.. versionadded:: 2.12
+'''
+from collections import OrderedDict
+import threading
+
+
+class LruCache(object):
+    '''
+    Thread-safe mapping that keeps the ``maxsize`` most recently used entries.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries.
+    '''
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # Mark as most recently used.
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,91 @@
+'''
+Cached plugin metadata.
+
+Plugin metadata (e.g., name and version) is parsed from ``properties.yml`` by
+:func:`microdrop.plugin_helpers.get_plugin_info`.  Parsed metadata is cached
+in a compact JSON file next to ``properties.yml``, keyed on the modified time
+and size of ``properties.yml``, so the YAML file is only parsed again after it
+changes.
+
+.. versionadded:: 2.12
+'''
+from collections import namedtuple
+import json
+import logging
+import os
+
+from microdrop.plugin_helpers import get_plugin_info
+
+logger = logging.getLogger(__name__)
+
+#: Name of metadata cache file (relative to plugin root directory).
+CACHE_NAME = '.plugin-info-cache.json'
+
+_cache = {}
+
+
+def _str(value):
+    # JSON strings are decoded as `unicode` in Python 2.
+    return str(value) if isinstance(value, type(u'')) else value
+
+
+def _source_key(properties_path):
+    stat = os.stat(properties_path)
+    return [stat.st_mtime, stat.st_size]
+
+
+def get_plugin_metadata(plugin_root):
+    '''
+    Parameters
+    ----------
+    plugin_root : str
+        Plugin root directory (i.e., directory containing ``properties.yml``).
+
+    Returns
+    -------
+    namedtuple or None
+        Plugin metadata with the same fields as returned by
+        :func:`microdrop.plugin_helpers.get_plugin_info`, or ``None`` if
+        plugin has no ``properties.yml``.
+    '''
+    plugin_root = os.path.abspath(plugin_root)
+    if plugin_root in _cache:
+        return _cache[plugin_root]
+
+    properties_path = os.path.join(plugin_root, 'properties.yml')
+    cache_path = os.path.join(plugin_root, CACHE_NAME)
+    if not os.path.isfile(properties_path):
+        return get_plugin_info(plugin_root)
+
+    source_key = _source_key(properties_path)
+    cached = None
+    try:
+        with open(cache_path, 'r') as input_:
+            cached = json.load(input_)
+        if cached['source_key'] != source_key:
+            cached = None
+    except (IOError, OSError, ValueError, KeyError):
+        cached = None
+
+    if cached is None:
+        info = get_plugin_info(plugin_root)
+        cached = {'source_key': source_key, 'fields': list(info._fields),
+                  'values': list(info)}
+        try:
+            temp_path = cache_path + '.tmp'
+            with open(temp_path, 'w') as output:
+                json.dump(cached, output)
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            os.rename(temp_path, cache_path)
+        except (IOError, OSError):
+            # Plugin directory may be read-only.  Metadata is still cached in
+            # memory for this process.
+            logger.debug('Error writing plugin metadata cache `%s`',
+                         cache_path, exc_info=True)
+
+    fields = map(_str, cached['fields'])
+    metadata = namedtuple('PluginMetadata', fields)(*map(_str,
+                                                         cached['values']))
+    _cache[plugin_root] = metadata
+    return metadata
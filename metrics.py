@@ -0,0 +1,197 @@
+'''
+Streaming latency histograms of device UI commands.
+
+.. versionadded:: 2.12
+'''
+from bisect import bisect_left
+from collections import deque
+import logging
+import threading
+
+from .timeline import monotonic
+
+logger = logging.getLogger(__name__)
+
+#: Upper bounds (in seconds) of histogram buckets (doubling from 0.5 ms to
+#: ~33 s).  Durations above the last bound are counted in an overflow bucket.
+BUCKET_BOUNDS_S = tuple(.0005 * 2 ** i for i in xrange(17))
+
+
+class LatencyHistogram(object):
+    '''
+    Histogram of durations with fixed buckets (i.e., bounded memory).
+    '''
+    def __init__(self, bounds_s=BUCKET_BOUNDS_S):
+        self.bounds_s = bounds_s
+        self.counts = [0] * (len(bounds_s) + 1)
+        self.count = 0
+        self.total_s = 0.
+        self.min_s = None
+        self.max_s = None
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, duration_s, outcome='ok'):
+        '''
+        Parameters
+        ----------
+        duration_s : float
+            Duration of call.
+        outcome : str, optional
+            ``'ok'``, ``'timeout'``, or ``'error'``.
+        '''
+        self.counts[bisect_left(self.bounds_s, duration_s)] += 1
+        self.count += 1
+        self.total_s += duration_s
+        self.min_s = duration_s if self.min_s is None else min(self.min_s,
+                                                               duration_s)
+        self.max_s = duration_s if self.max_s is None else max(self.max_s,
+                                                               duration_s)
+        if outcome == 'timeout':
+            self.timeouts += 1
+        elif outcome == 'error':
+            self.errors += 1
+
+    def percentile(self, q):
+        '''
+        Parameters
+        ----------
+        q : float
+            Percentile, between 0 and 100.
+
+        Returns
+        -------
+        float or None
+            Upper bound of bucket containing percentile (or maximum duration,
+            if lower), or ``None`` if no durations have been recorded.
+        '''
+        if not self.count:
+            return None
+        rank = max(q / 100. * self.count, 1)
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                break
+        if i < len(self.bounds_s):
+            return min(self.bounds_s[i], self.max_s)
+        return self.max_s
+
+    def as_dict(self):
+        '''
+        Returns
+        -------
+        dict
+            JSON-compatible summary, including non-empty ``buckets`` as
+            ``{'le_s': <upper bound or None>, 'count': ...}`` entries.
+        '''
+        bounds_s = list(self.bounds_s) + [None]
+        return {'count': self.count, 'timeouts': self.timeouts,
+                'errors': self.errors,
+                'mean_s': self.total_s / self.count if self.count else None,
+                'min_s': self.min_s, 'max_s': self.max_s,
+                'p50_s': self.percentile(50), 'p90_s': self.percentile(90),
+                'p99_s': self.percentile(99),
+                'buckets': [{'le_s': bound_s, 'count': count}
+                            for bound_s, count in zip(bounds_s, self.counts)
+                            if count]}
+
+
+class CommandMetrics(object):
+    '''
+    Latency histogram, timeout count, and error count of each command.
+
+    Parameters
+    ----------
+    log_interval_s : float, optional
+        Minimum interval between summaries logged (at ``INFO`` level) as
+        commands are recorded.  Summaries are not logged if ``None``.
+    window : int, optional
+        Number of most recent successful durations of each command kept for
+        :meth:`recent_percentile`.
+    '''
+    def __init__(self, log_interval_s=300, window=64):
+        self.log_interval_s = log_interval_s
+        self.window = window
+        self.histograms = {}
+        self._recent = {}
+        # Commands that timed out since their last successful call.
+        self._timed_out = set()
+        self._lock = threading.Lock()
+        self._last_log = monotonic()
+
+    def record(self, command, duration_s, outcome='ok'):
+        with self._lock:
+            if command not in self.histograms:
+                self.histograms[command] = LatencyHistogram()
+            self.histograms[command].record(duration_s, outcome)
+            if outcome == 'ok':
+                if command not in self._recent:
+                    self._recent[command] = deque(maxlen=self.window)
+                self._recent[command].append(duration_s)
+                self._timed_out.discard(command)
+            elif outcome == 'timeout':
+                self._timed_out.add(command)
+            now = monotonic()
+            log = (self.log_interval_s is not None and
+                   now - self._last_log >= self.log_interval_s)
+            if log:
+                self._last_log = now
+        if log:
+            self.log_summary()
+
+    def recent_percentile(self, command, q, min_count=8):
+        '''
+        Parameters
+        ----------
+        command : str
+            Command name.
+        q : float
+            Percentile, between 0 and 100.
+        min_count : int, optional
+            Minimum number of recent successful calls required.
+
+        Returns
+        -------
+        float or None
+            Percentile of recent successful durations of command, or ``None``
+            if there are fewer than ``min_count`` or if the most recent call
+            of command timed out.
+        '''
+        with self._lock:
+            if command in self._timed_out:
+                return None
+            durations_s = sorted(self._recent.get(command, ()))
+        if len(durations_s) < max(min_count, 1):
+            return None
+        return durations_s[min(int(q / 100. * len(durations_s)),
+                               len(durations_s) - 1)]
+
+    def histogram(self, command):
+        '''
+        Returns
+        -------
+        LatencyHistogram or None
+            Histogram of command (``None`` if command has not been recorded).
+        '''
+        return self.histograms.get(command)
+
+    def stats(self):
+        '''
+        Returns
+        -------
+        dict
+            Summary of each command histogram (see
+            :meth:`LatencyHistogram.as_dict`), keyed by command.
+        '''
+        with self._lock:
+            return dict([(command, histogram.as_dict())
+                         for command, histogram in self.histograms.items()])
+
+    def log_summary(self):
+        for command, stats in sorted(self.stats().items()):
+            logger.info('[rpc] %-20s n=%d p50=%.1fms p90=%.1fms max=%.1fms '
+                        'timeouts=%d errors=%d', command, stats['count'],
+                        1e3 * stats['p50_s'], 1e3 * stats['p90_s'],
+                        1e3 * stats['max_s'], stats['timeouts'],
+                        stats['errors'])
@@ -0,0 +1,172 @@
+'''
+Launch and terminate device UI process trees.
+
+.. versionadded:: 2.12
+'''
+from collections import namedtuple
+import logging
+import os
+import signal
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+if sys.platform == 'win32':
+    from subprocess import CREATE_NEW_PROCESS_GROUP
+
+    #: Keyword arguments for :class:`subprocess.Popen` to launch process in a
+    #: new process group.
+    NEW_PROCESS_GROUP_KWARGS = {'creationflags': CREATE_NEW_PROCESS_GROUP}
+else:
+    NEW_PROCESS_GROUP_KWARGS = {'preexec_fn': os.setsid}
+
+
+#: Result of :func:`kill_process_tree`.
+#:
+#: ``terminated`` and ``killed`` are lists of ``(pid, seconds)`` tuples of
+#: processes that exited after a graceful stop request or after being killed,
+#: respectively, where ``seconds`` is the time since termination started.
+#: ``alive`` is a list of process IDs still running at the deadline.
+TerminationReport = namedtuple('TerminationReport', 'terminated killed alive '
+                               'duration_s')
+
+
+def _signal_group(pid, graceful):
+    '''
+    Signal process group led by ``pid`` (if any).
+
+    On Windows, a graceful stop is requested by sending ``CTRL_BREAK_EVENT``
+    to a process launched with ``CREATE_NEW_PROCESS_GROUP``.  On POSIX, the
+    process group is sent ``SIGTERM`` (graceful) or ``SIGKILL``.
+
+    Returns
+    -------
+    bool
+        ``True`` if the process group was signalled.
+    '''
+    try:
+        if sys.platform == 'win32':
+            if not graceful:
+                return False
+            os.kill(pid, signal.CTRL_BREAK_EVENT)
+        else:
+            if os.getpgid(pid) != pid:
+                # Process is not a process group leader.
+                return False
+            os.killpg(pid, signal.SIGTERM if graceful else signal.SIGKILL)
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+def _wait_procs(processes, timeout_s, callback):
+    '''
+    Wait for processes to exit, like :func:`psutil.wait_procs`, but count
+    zombie processes (e.g., children of a hung parent that does not reap
+    them) as exited.
+
+    Returns
+    -------
+    list
+        Processes still running after ``timeout_s`` seconds.
+    '''
+    import psutil
+
+    deadline = time.time() + timeout_s
+    alive = processes
+    while True:
+        timeout = max(0, min(.05, deadline - time.time()))
+        gone, alive = psutil.wait_procs(alive, timeout=timeout,
+                                        callback=callback)
+        running = []
+        for process in alive:
+            try:
+                zombie = process.status() == psutil.STATUS_ZOMBIE
+            except psutil.NoSuchProcess:
+                zombie = True
+            if zombie:
+                callback(process)
+            else:
+                running.append(process)
+        alive = running
+        if not alive or time.time() >= deadline:
+            return alive
+
+
+def kill_process_tree(pid, including_parent=True, timeout_s=5,
+                      graceful_timeout_s=1):
+    '''
+    Cross-platform function to kill a parent process and all child processes.
+
+    Based on from `subprocess: deleting child processes in Windows <https://stackoverflow.com/a/4229404/345236>`_
+
+    Parameters
+    ----------
+    pid : int
+        Process ID of parent process.
+    including_parent : bool, optional
+        If ``True``, also kill parent process.
+    timeout_s : float, optional
+        Overall deadline (in seconds) for all processes to exit.
+    graceful_timeout_s : float, optional
+        Duration (in seconds) to wait for processes to exit after a graceful
+        stop request, before killing any remaining processes.
+
+    Returns
+    -------
+    TerminationReport
+        Processes that exited (and when), and any processes still running at
+        the deadline.
+
+
+    .. versionchanged:: 2.12
+        Request a graceful stop of all processes in the tree at once (using a
+        process group signal where available), then kill any remaining
+        processes at once, all within a single overall deadline.  Return
+        :data:`TerminationReport`.
+    '''
+    import psutil
+
+    start = time.time()
+    deadline = start + timeout_s
+    terminated = []
+    killed = []
+
+    try:
+        parent = psutil.Process(pid)
+        processes = parent.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return TerminationReport([], [], [], time.time() - start)
+    if including_parent:
+        processes.append(parent)
+
+    def _on_exit(results):
+        def _callback(process):
+            results.append((process.pid, time.time() - start))
+        return _callback
+
+    # Request graceful stop of all processes at once.
+    if not (including_parent and _signal_group(pid, graceful=True)):
+        for process in processes:
+            try:
+                process.terminate()
+            except psutil.NoSuchProcess:
+                pass
+    alive = _wait_procs(processes, max(0, min(graceful_timeout_s,
+                                              deadline - time.time())),
+                        _on_exit(terminated))
+
+    if alive:
+        # Kill remaining processes at once.
+        if including_parent:
+            _signal_group(pid, graceful=False)
+        for process in alive:
+            try:
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        alive = _wait_procs(alive, max(0, deadline - time.time()),
+                            _on_exit(killed))
+    return TerminationReport(terminated, killed, [p.pid for p in alive],
+                             time.time() - start)
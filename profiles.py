@@ -0,0 +1,173 @@
+'''
+Named device UI settings profiles (e.g., one per chip or camera).
+
+Profiles are stored as JSON in the ``ui_profiles`` app value, e.g.::
+
+    {"chip-a": {"device_id": "camera-1",
+                "settings": {"video_config": "...", "surface_alphas": "...",
+                             "canvas_corners": "corners-v1:...",
+                             "frame_corners": "corners-v1:..."}}}
+
+.. versionadded:: 2.12
+'''
+from collections import OrderedDict
+import json
+
+from .corners import CORNERS_KEYS
+
+#: App value keys of settings stored in each profile.
+PROFILE_KEYS = ('video_config', 'surface_alphas') + CORNERS_KEYS
+
+
+class ProfileStore(object):
+    '''
+    Named settings profiles, indexed by name and by device (or camera) id.
+
+    Settings of each profile are converted once (when loaded or saved) to
+    the Python types expected by ``set_ui_settings``, so a profile may be
+    applied without parsing.
+
+    Parameters
+    ----------
+    convert : function
+        Converts settings in JSON-compatible format to Python types (e.g.,
+        ``DmfDeviceUiPlugin.json_settings_as_python``).
+    '''
+    def __init__(self, convert):
+        self.convert = convert
+        self._profiles = OrderedDict()
+        # Settings of each profile in Python types, keyed by profile name.
+        self._ui_settings = {}
+        # Name of most recently saved profile, keyed by device id.
+        self._by_device = {}
+
+    def __contains__(self, name):
+        return name in self._profiles
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def names(self):
+        return list(self._profiles)
+
+    def load(self, text):
+        '''
+        Parameters
+        ----------
+        text : str
+            Profiles as stored in app values (empty if not set).
+
+        Raises
+        ------
+        ValueError
+            If text is not a JSON object of profiles, each a JSON object with
+            an object of ``settings``.
+        '''
+        profiles = (json.loads(text, object_pairs_hook=OrderedDict)
+                    if text else OrderedDict())
+        if not isinstance(profiles, dict):
+            raise ValueError('Unexpected profiles: `%s`' % text)
+        for name, profile in profiles.items():
+            if (not isinstance(profile, dict) or
+                    not isinstance(profile.get('settings', {}), dict)):
+                raise ValueError('Unexpected profile `%s`: `%s`' %
+                                 (name, profile))
+        self._profiles.clear()
+        self._ui_settings.clear()
+        self._by_device.clear()
+        for name, profile in profiles.items():
+            self._add(name, profile.get('device_id'),
+                      profile.get('settings', {}))
+
+    def to_text(self):
+        '''
+        Returns
+        -------
+        str
+            Profiles as stored in app values.
+        '''
+        return (json.dumps(self._profiles, separators=(',', ':'))
+                if self._profiles else '')
+
+    def _add(self, name, device_id, json_settings):
+        settings = dict([(k, json_settings[k]) for k in PROFILE_KEYS
+                         if k in json_settings])
+        ui_settings = self.convert(settings)
+        self._profiles.pop(name, None)
+        self._profiles[name] = {'device_id': device_id, 'settings': settings}
+        self._ui_settings[name] = ui_settings
+        self._by_device = dict([(k, v) for k, v in self._by_device.items()
+                                if v != name])
+        if device_id is not None:
+            self._by_device[device_id] = name
+
+    def save(self, name, json_settings, device_id=None):
+        '''
+        Add (or replace) profile.
+
+        Parameters
+        ----------
+        name : str
+            Profile name.
+        json_settings : dict
+            Settings in JSON-compatible format (only keys in ``PROFILE_KEYS``
+            are stored).
+        device_id : str, optional
+            Device (or camera) id to index profile by.
+        '''
+        self._add(name, device_id, json_settings)
+
+    def remove(self, name):
+        '''
+        Raises
+        ------
+        KeyError
+            If profile does not exist.
+        '''
+        del self._profiles[name]
+        del self._ui_settings[name]
+        self._by_device = dict([(k, v) for k, v in self._by_device.items()
+                                if v != name])
+
+    def find(self, device_id):
+        '''
+        Returns
+        -------
+        str or None
+            Name of most recently saved profile for device id, or ``None``.
+        '''
+        return self._by_device.get(device_id)
+
+    def json_settings(self, name):
+        '''
+        Raises
+        ------
+        KeyError
+            If profile does not exist.
+        '''
+        return dict(self._profiles[name]['settings'])
+
+    def ui_settings(self, name):
+        '''
+        Returns
+        -------
+        dict
+            Settings of profile in Python types expected by
+            ``set_ui_settings`` (copy; values must not be modified in place).
+
+        Raises
+        ------
+        KeyError
+            If profile does not exist.
+        '''
+        return dict(self._ui_settings[name])
+
+    def get_profiles(self):
+        '''
+        Returns
+        -------
+        dict
+            Device id of each profile, keyed by profile name.
+        '''
+        return OrderedDict([(name, profile['device_id'])
+                            for name, profile in self._profiles.items()])
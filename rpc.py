@@ -0,0 +1,431 @@
+'''
+Client for DMF device UI plugin commands.
+
+Besides the commands supported by all device UI versions, the client can use
+the following *optional* batched commands, if the running device UI process
+implements them:
+
+ - ``get_ui_state(fields)``: return ``dict`` with a value for each requested
+   field, plus an ``errors`` ``dict`` mapping any field that could not be read
+   to an error message.  Fields are ``video_config``, ``surface_alphas`` and
+   ``corners`` (same value as returned by ``get_corners``).
+ - ``apply_ui_settings(settings, default_corners)``: apply any of
+   ``video_config``, ``surface_alphas``, ``df_canvas_corners`` and
+   ``df_frame_corners`` (both corners or neither) as one transaction, with a
+   single redraw.  Corners are applied as by ``set_default_corners`` if
+   ``default_corners`` is ``True``, otherwise as by ``set_corners``.
+ - ``get_wire_formats()``: return list of supported wire formats (see
+   :mod:`.codec`).  If :data:`.codec.WIRE_FORMAT` is supported, settings
+   values sent with ``apply_ui_settings`` and returned by ``get_ui_state``
+   are encoded (corners within the ``corners`` field as ``df_canvas_corners``
+   and ``df_frame_corners``), and ``encoding`` keyword argument is passed to
+   both commands.
+
+If a device UI process replies that an optional command is not recognized,
+the command is not sent again to that process and callers fall back to the
+equivalent individual commands.
+
+.. note::
+    Released ``dmf_device_ui`` versions do not implement the optional
+    commands yet (only the fake device UI of the benchmark suite does), so
+    the batched commands and the wire format are inert until the device UI
+    side is released: each new device UI process costs one failed round trip
+    per optional command (i.e., at most three) before the plugin falls back.
+
+Requests are sent using :func:`hub_execute`, one at a time: the MicroDrop hub
+client is a single ZeroMQ socket, which must not be used by several threads at
+the same time.
+
+.. versionadded:: 2.12
+'''
+import hashlib
+import logging
+import threading
+import time
+
+from microdrop.plugin_helpers import hub_execute
+
+from .codec import WIRE_FORMAT
+from .settings import as_pandas, as_text, as_wire, from_wire
+from .metrics import CommandMetrics
+from .timeline import monotonic
+
+logger = logging.getLogger(__name__)
+
+#: Fields of UI state that may be requested using ``get_ui_state``.
+UI_STATE_FIELDS = ('video_config', 'corners', 'surface_alphas')
+#: Settings that may be applied using ``apply_ui_settings``.
+UI_SETTINGS_KEYS = ('video_config', 'surface_alphas', 'df_canvas_corners',
+                    'df_frame_corners')
+
+
+def fingerprint(*values):
+    '''
+    Fingerprint of one or more settings values.
+
+    Each value may be ``None``, a string (as stored in app values), a settings
+    model (see :mod:`.settings`), or a :mod:`pandas` object.  Values are
+    fingerprinted in the same serialized form as stored in app values (see
+    :func:`.settings.as_text`).
+
+    Returns
+    -------
+    str
+        Hex digest.
+    '''
+    digest = hashlib.sha1()
+    for value in values:
+        if not isinstance(value, basestring):
+            value = as_text(value)
+        if not isinstance(value, bytes):
+            value = value.encode('utf8')
+        digest.update(value)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def is_unrecognized_command(exception):
+    '''
+    Returns
+    -------
+    bool
+        ``True`` if exception was raised for a reply from a plugin that does
+        not implement the requested command.
+    '''
+    return 'unrecognized command' in str(exception).lower()
+
+
+class CommandNotSupported(Exception):
+    '''
+    Raised if optional command is not implemented by device UI process.
+    '''
+    pass
+
+
+class DeviceUiClient(object):
+    '''
+    Execute commands on device UI plugin through the hub.
+
+    Parameters
+    ----------
+    name : str
+        Name of device UI plugin registered with hub.
+    deadline_floor_s : float, optional
+        Minimum adaptive deadline (see :meth:`deadline`).
+    deadline_factor : float, optional
+        Adaptive deadline, as a multiple of recent latency percentile.
+    deadline_percentile : float, optional
+        Percentile of recent latencies used for adaptive deadline.
+    '''
+    def __init__(self, name, deadline_floor_s=.25, deadline_factor=4,
+                 deadline_percentile=99):
+        self.name = name
+        self.deadline_floor_s = deadline_floor_s
+        self.deadline_factor = deadline_factor
+        self.deadline_percentile = deadline_percentile
+        # Serialize requests made from different threads (e.g., GTK thread,
+        # start up worker, video toggles, and auto-save).
+        self._lock = threading.Lock()
+        #: Optional commands not implemented by current device UI process.
+        self.unsupported = set()
+        #: Fingerprints (see :func:`fingerprint`) of settings last applied to
+        #: or read from current device UI process, keyed by field (i.e.,
+        #: ``video_config``, ``surface_alphas``, or ``corners``).
+        self.fingerprints = {}
+        #: Video state last requested from current device UI process
+        #: (``None`` if unknown).
+        self.video_enabled = None
+        # Negotiated wire format (`''` if none; `None` if not negotiated).
+        self._wire_format = None
+        #: Delay (in seconds) before negotiating wire format again after a
+        #: timeout.
+        self.wire_format_retry_s = 30.
+        self._wire_format_retry_at = 0
+        #: Latency histograms, timeout and error counts of each command.
+        self.metrics = CommandMetrics()
+
+    def reset(self):
+        '''
+        Forget negotiated commands, settings fingerprints, and video state
+        (e.g., when device UI process restarts).
+        '''
+        self._wire_format = None
+        self._wire_format_retry_at = 0
+        self.unsupported.clear()
+        self.fingerprints.clear()
+        self.video_enabled = None
+
+    def supports(self, command):
+        return command not in self.unsupported
+
+    def deadline(self, command, ceiling_s, floor_s=None):
+        '''
+        Adaptive timeout for command, learned from recent latencies.
+
+        Parameters
+        ----------
+        command : str
+            Command name.
+        ceiling_s : float
+            Maximum timeout (also used until enough latencies are recorded,
+            and after the command last timed out).
+        floor_s : float, optional
+            Minimum timeout (default: :attr:`deadline_floor_s`).
+
+        Returns
+        -------
+        float
+            :attr:`deadline_factor` times :attr:`deadline_percentile` of
+            recent successful latencies, limited to ``[floor_s,
+            ceiling_s]``.
+        '''
+        if floor_s is None:
+            floor_s = self.deadline_floor_s
+        latency_s = self.metrics.recent_percentile(command,
+                                                   self.deadline_percentile)
+        if latency_s is None:
+            return ceiling_s
+        return min(max(self.deadline_factor * latency_s, floor_s), ceiling_s)
+
+    def execute(self, command, target=None, **kwargs):
+        '''
+        Execute command on device UI plugin (or on another plugin).
+
+        Accepts the same keyword arguments as
+        :func:`microdrop.plugin_helpers.hub_execute` (e.g., ``timeout_s``).
+        Requests are sent one at a time, so ``timeout_s`` includes any time
+        spent waiting for requests made from other threads to complete.
+
+        Duration and outcome of each call are recorded in :attr:`metrics`,
+        keyed by command name (prefixed with ``target`` and ``.``, for other
+        plugins).
+
+        Parameters
+        ----------
+        command : str
+            Command name.
+        target : str, optional
+            Name of plugin to execute command on (default: device UI plugin).
+
+        Raises
+        ------
+        IOError
+            If device UI did not respond in time.
+        '''
+        key = command if target is None else '%s.%s' % (target, command)
+        start = monotonic()
+        timeout_s = kwargs.get('timeout_s')
+        if not self._acquire(timeout_s):
+            self.metrics.record(key, monotonic() - start, 'timeout')
+            raise IOError('Timed out after %ss waiting to send `%s`.' %
+                          (timeout_s, command))
+        try:
+            sent = monotonic()
+            if timeout_s is not None:
+                kwargs['timeout_s'] = timeout_s - (sent - start)
+            try:
+                result = hub_execute(target or self.name, command, **kwargs)
+            except IOError:
+                self.metrics.record(key, monotonic() - sent, 'timeout')
+                raise
+            except Exception:
+                self.metrics.record(key, monotonic() - sent, 'error')
+                raise
+            self.metrics.record(key, monotonic() - sent)
+            return result
+        finally:
+            self._lock.release()
+
+    def _acquire(self, timeout_s=None):
+        '''
+        Acquire request lock.
+
+        Returns
+        -------
+        bool
+            ``True`` if lock was acquired within ``timeout_s`` seconds.
+        '''
+        if timeout_s is None:
+            return self._lock.acquire()
+        # In Python 2, `Lock.acquire` does not support a timeout.
+        deadline = monotonic() + timeout_s
+        while not self._lock.acquire(False):
+            if monotonic() >= deadline:
+                return False
+            time.sleep(.001)
+        return True
+
+    def execute_optional(self, command, **kwargs):
+        '''
+        Execute optional command on device UI plugin.
+
+        Raises
+        ------
+        CommandNotSupported
+            If device UI process does not recognize command.
+        IOError
+            If device UI did not respond in time.
+        Exception
+            Any other error raised by command.
+        '''
+        if command in self.unsupported:
+            raise CommandNotSupported(command)
+        try:
+            return self.execute(command, **kwargs)
+        except IOError:
+            raise
+        except Exception as exception:
+            if not is_unrecognized_command(exception):
+                # Command is supported, but failed (e.g., invalid settings).
+                raise
+            logger.info('Device UI does not support `%s` command; fall back '
+                        'to individual commands.', command)
+            self.unsupported.add(command)
+            raise CommandNotSupported(command)
+
+    def wire_format(self, timeout_s=1):
+        '''
+        Negotiate wire format with device UI process (once per process).
+
+        If negotiation times out, it is not attempted again for
+        :attr:`wire_format_retry_s` seconds.
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximum duration (in seconds) to wait for negotiation.  If not
+            positive, do not negotiate (i.e., return ``None`` unless already
+            negotiated).
+
+        Returns
+        -------
+        str or None
+            :data:`.codec.WIRE_FORMAT` if supported by device UI process,
+            otherwise ``None`` (i.e., send values as :mod:`pandas` objects).
+        '''
+        if (self._wire_format is None and timeout_s > 0 and
+                monotonic() >= self._wire_format_retry_at):
+            try:
+                formats = self.execute_optional('get_wire_formats',
+                                                timeout_s=timeout_s)
+            except CommandNotSupported:
+                formats = []
+            except IOError:
+                self._wire_format_retry_at = (monotonic() +
+                                              self.wire_format_retry_s)
+                return None
+            except Exception:
+                logger.warning('Error negotiating wire format; send settings '
+                               'as pandas objects.', exc_info=True)
+                formats = []
+            self._wire_format = WIRE_FORMAT if WIRE_FORMAT in formats else ''
+        return self._wire_format or None
+
+    def get_ui_state(self, fields=UI_STATE_FIELDS, timeout_s=2):
+        '''
+        Request several fields of UI state in a single request.
+
+        Parameters
+        ----------
+        fields : list, optional
+            Fields to request (subset of :data:`UI_STATE_FIELDS`).
+        timeout_s : float, optional
+            Maximum duration (in seconds) to wait for response (see
+            :meth:`deadline`).
+
+        Returns
+        -------
+        tuple
+            ``(state, errors)``, where ``state`` maps each field read to its
+            value and ``errors`` maps each field that could not be read to
+            an error message.  Values are settings models (see
+            :mod:`.settings`) if wire format was negotiated, otherwise
+            :mod:`pandas` objects.
+
+        Raises
+        ------
+        CommandNotSupported
+            If device UI process does not implement ``get_ui_state``.
+        IOError
+            If device UI did not respond in time.
+        '''
+        start = monotonic()
+        if self.supports('get_ui_state'):
+            wire_format = self.wire_format(min(1, timeout_s))
+        else:
+            wire_format = None
+        # Negotiation is part of the overall deadline.
+        remaining_s = timeout_s - (monotonic() - start)
+        if remaining_s <= 0:
+            raise IOError('Timed out negotiating wire format.')
+        kwargs = {'encoding': wire_format} if wire_format else {}
+        response = self.execute_optional('get_ui_state', fields=list(fields),
+                                         timeout_s=self
+                                         .deadline('get_ui_state',
+                                                   remaining_s),
+                                         **kwargs)
+        errors = dict(response.pop('errors', None) or {})
+        state = dict([(k, v) for k, v in response.items() if k in fields])
+        if wire_format:
+            for field, value in state.items():
+                try:
+                    if field == 'corners':
+                        for k in ('df_canvas_corners', 'df_frame_corners'):
+                            if k in value:
+                                value[k] = from_wire(field, value[k])
+                    else:
+                        state[field] = from_wire(field, value)
+                except Exception as exception:
+                    del state[field]
+                    errors[field] = 'Error decoding: %s' % exception
+        for field in fields:
+            if field not in state and field not in errors:
+                errors[field] = 'Missing from response.'
+        return state, errors
+
+    def apply_ui_settings(self, ui_settings, default_corners=False,
+                          timeout_s=5):
+        '''
+        Apply several UI settings in a single request.
+
+        Parameters
+        ----------
+        ui_settings : dict
+            Settings to apply, keyed by name (subset of
+            :data:`UI_SETTINGS_KEYS`).  Values may be settings models (see
+            :mod:`.settings`) or :mod:`pandas` objects.
+        default_corners : bool, optional
+            If ``True``, set corners as default corners.
+        timeout_s : float, optional
+            Maximum duration (in seconds) to wait for response.
+
+        Raises
+        ------
+        CommandNotSupported
+            If device UI process does not implement ``apply_ui_settings``.
+        IOError
+            If device UI did not respond in time.
+        '''
+        settings = dict([(k, v) for k, v in ui_settings.items()
+                         if k in UI_SETTINGS_KEYS])
+        start = monotonic()
+        kwargs = {}
+        if (self.supports('apply_ui_settings') and
+                self.wire_format(min(1, timeout_s))):
+            try:
+                settings = dict([(k, as_wire(v))
+                                 for k, v in settings.items()])
+            except TypeError:
+                logger.debug('Send settings as pandas objects.',
+                             exc_info=True)
+            else:
+                kwargs['encoding'] = WIRE_FORMAT
+        if not kwargs:
+            settings = dict([(k, as_pandas(v)) for k, v in settings.items()])
+        # Negotiation is part of the overall deadline.
+        remaining_s = timeout_s - (monotonic() - start)
+        if remaining_s <= 0:
+            raise IOError('Timed out negotiating wire format.')
+        return self.execute_optional('apply_ui_settings', settings=settings,
+                                     default_corners=default_corners,
+                                     timeout_s=remaining_s, **kwargs)
@@ -0,0 +1,228 @@
+'''
+Lightweight model of device UI settings (video config, surface alphas, and
+corners) that does not depend on :mod:`pandas`.
+
+Settings are converted to :mod:`pandas` objects only when sent to a device UI
+process that does not support the plugin wire format (see :mod:`.codec`).
+Released device UI versions do not support the wire format yet (see
+:mod:`.rpc`), so :mod:`pandas` is still imported in the plugin process once
+settings are sent to (or received from) them.
+
+.. versionadded:: 2.12
+'''
+from collections import OrderedDict
+import json
+
+from . import codec
+from .corners import (COLUMNS as CORNERS_COLUMNS, POINT_COUNT,
+                      corners_as_text, pack_corners, parse_corners)
+
+
+def _as_python(value):
+    # Convert :mod:`numpy` scalar (e.g., from object-dtype series) to
+    # equivalent Python type, which may be JSON serialized.
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _json_text(items):
+    return json.dumps(OrderedDict(items), separators=(',', ':')) \
+        if items else ''
+
+
+class SeriesSettings(object):
+    '''
+    Ordered ``(label, value)`` items (e.g., equivalent to
+    :class:`pandas.Series`).
+    '''
+    __slots__ = ('items', )
+
+    def __init__(self, items=()):
+        self.items = tuple(items)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.items == other.items
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, list(self.items))
+
+    @classmethod
+    def from_text(cls, text):
+        '''
+        Parameters
+        ----------
+        text : str
+            JSON object, as stored in app values (empty if not set).
+        '''
+        if not text:
+            return cls()
+        return cls(json.loads(text, object_pairs_hook=OrderedDict).items())
+
+    def to_text(self):
+        '''
+        Returns
+        -------
+        str
+            JSON object (empty if there are no items).
+        '''
+        return _json_text(self.items)
+
+    def to_wire(self):
+        '''
+        Returns
+        -------
+        str
+            Value encoded in plugin wire format (see :mod:`.codec`).
+        '''
+        return codec.pack_json(self.to_text() or '{}')
+
+    def to_pandas(self):
+        import pandas as pd
+
+        if not self.items:
+            return pd.Series(None)
+        return pd.Series(OrderedDict(self.items))
+
+
+class VideoConfig(SeriesSettings):
+    '''
+    Video configuration (e.g., device name, width, height, frame rate).
+    '''
+    __slots__ = ()
+
+
+class SurfaceAlphas(SeriesSettings):
+    '''
+    Opacity of each device UI surface, keyed by surface name.
+    '''
+    __slots__ = ()
+
+    def to_wire(self):
+        return codec.pack_series([alpha for name, alpha in self.items],
+                                 [name for name, alpha in self.items])
+
+
+class Corners(object):
+    '''
+    Four ``(x, y)`` corner points.
+    '''
+    __slots__ = ('points', )
+
+    def __init__(self, points):
+        self.points = tuple((float(x), float(y)) for x, y in points)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.points == other.points
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Corners(%r)' % (list(self.points), )
+
+    @classmethod
+    def from_text(cls, text):
+        '''
+        Raises
+        ------
+        ValueError
+            If corners are not in compact encoding or CSV with the default
+            layout (see :func:`.corners.parse_corners`).
+        '''
+        return cls(parse_corners(text))
+
+    def to_text(self):
+        return pack_corners(self.points)
+
+    def to_wire(self):
+        return codec.pack_frame(self.points, range(len(self.points)),
+                                CORNERS_COLUMNS)
+
+    def to_pandas(self):
+        import pandas as pd
+
+        return pd.DataFrame(list(self.points), columns=CORNERS_COLUMNS)
+
+
+def as_text(value):
+    '''
+    Parameters
+    ----------
+    value : SeriesSettings, Corners, pandas.Series, pandas.DataFrame, or None
+        Settings value.
+
+    Returns
+    -------
+    str
+        Value as stored in app values.
+    '''
+    if value is None:
+        return ''
+    elif hasattr(value, 'to_text'):
+        return value.to_text()
+    elif hasattr(value, 'columns'):
+        return corners_as_text(value)
+    return _json_text([(k, _as_python(v))
+                       for k, v in zip(value.index.tolist(), value.tolist())])
+
+
+def as_pandas(value):
+    '''
+    Returns
+    -------
+    object
+        Value as :mod:`pandas` object, as expected by device UI commands.
+    '''
+    return value.to_pandas() if hasattr(value, 'to_pandas') else value
+
+
+def as_wire(value):
+    '''
+    Returns
+    -------
+    str
+        Value encoded in plugin wire format (see :mod:`.codec`).
+
+    Raises
+    ------
+    TypeError
+        If value cannot be encoded.
+    '''
+    return value.to_wire() if hasattr(value, 'to_wire') else \
+        codec.encode(value)
+
+
+def from_wire(field, data):
+    '''
+    Parameters
+    ----------
+    field : str
+        ``video_config``, ``surface_alphas``, or ``corners``.
+    data : str
+        Value encoded in plugin wire format.
+
+    Returns
+    -------
+    SeriesSettings, Corners, pandas.DataFrame, or None
+        Decoded value (corners not in the default layout are decoded as
+        :class:`pandas.DataFrame`).
+    '''
+    kind, labels, values = codec.unpack(data)
+    if kind == codec.KIND_NONE:
+        return None
+    elif kind == codec.KIND_JSON:
+        return VideoConfig(values.items()) if field == 'video_config' else \
+            SurfaceAlphas(values.items())
+    elif kind == codec.KIND_SERIES:
+        cls = SurfaceAlphas if field == 'surface_alphas' else VideoConfig
+        return cls(zip(labels['index'], values))
+    elif (tuple(labels['columns']) == CORNERS_COLUMNS and
+          labels['index'] == list(range(POINT_COUNT)) and
+          labels['index_name'] is None):
+        return Corners(values)
+    return codec.decode(data)
@@ -0,0 +1,153 @@
+'''
+Warm-standby device UI processes.
+
+A standby process pre-imports the DMF device UI module (and, transitively,
+heavy dependencies such as ``gtk``, ``pandas``, etc.) and then blocks until
+it is *adopted*, i.e., until the command-line arguments for the device UI are
+written to its ``stdin``.  Adopting a standby process skips the interpreter
+start-up and import cost of a cold spawn.
+
+This module is also executed as a script to run the standby process itself,
+so it must only import from the standard library at module level.
+
+.. versionadded:: 2.12
+'''
+from subprocess import Popen, PIPE
+import json
+import logging
+import os
+import runpy
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+#: Module run by device UI processes.
+DEVICE_UI_MODULE = 'dmf_device_ui.bin.device_view'
+
+
+class WarmStandbyPool(object):
+    '''
+    Keep a single pre-spawned, pre-imported device UI process waiting.
+
+    Parameters
+    ----------
+    module : str, optional
+        Module to run once the standby process is adopted.
+    respawn_delay_s : float, optional
+        Delay (in seconds) before spawning a replacement standby process after
+        the current one is adopted.  The delay avoids competing for CPU with
+        the adopted process while it connects to the hub.
+    popen_kwargs : dict, optional
+        Extra keyword arguments passed to :class:`subprocess.Popen`.
+    '''
+    def __init__(self, module=DEVICE_UI_MODULE, respawn_delay_s=5.,
+                 popen_kwargs=None):
+        self.module = module
+        self.respawn_delay_s = respawn_delay_s
+        self.popen_kwargs = popen_kwargs or {}
+        self.process = None
+        self.enabled = False
+        self._respawn_timer = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        '''
+        Enable pool and spawn a standby process (if none is waiting).
+        '''
+        with self._lock:
+            self.enabled = True
+            if self.process is None or self.process.poll() is not None:
+                script = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+                self.process = Popen([sys.executable, script, self.module],
+                                     stdin=PIPE, **self.popen_kwargs)
+                logger.info('Spawned warm-standby device UI process `%s`',
+                            self.process.pid)
+
+    def adopt(self, args):
+        '''
+        Run device UI in the standby process using the specified arguments.
+
+        A replacement standby process is spawned in the background after
+        :attr:`respawn_delay_s`.
+
+        Parameters
+        ----------
+        args : list
+            Command-line arguments for the device UI module.
+
+        Returns
+        -------
+        subprocess.Popen or None
+            Adopted process, or ``None`` if no standby process is waiting.
+        '''
+        with self._lock:
+            process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return None
+        try:
+            process.stdin.write(json.dumps(args) + '\n')
+            process.stdin.close()
+        except (IOError, OSError):
+            logger.debug('Error adopting standby process `%s`', process.pid,
+                         exc_info=True)
+            return None
+        logger.info('Adopted warm-standby device UI process `%s`',
+                    process.pid)
+        if self.enabled:
+            self._respawn_timer = threading.Timer(self.respawn_delay_s,
+                                                  self._respawn)
+            self._respawn_timer.daemon = True
+            self._respawn_timer.start()
+        return process
+
+    def _respawn(self):
+        if self.enabled:
+            self.start()
+
+    def stop(self):
+        '''
+        Disable pool and kill standby process (if any).
+
+        The standby process has not run the device UI yet, so it is safe to
+        kill it outright rather than waiting for it to finish its imports.
+        '''
+        with self._lock:
+            self.enabled = False
+            if self._respawn_timer is not None:
+                self._respawn_timer.cancel()
+                self._respawn_timer = None
+            process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            logger.info('Stop warm-standby device UI process `%s`',
+                        process.pid)
+            try:
+                process.kill()
+                process.wait()
+            except Exception:
+                logger.debug('Error stopping standby process `%s`',
+                             process.pid, exc_info=True)
+
+
+def main(module):
+    '''
+    Pre-import device UI module, then wait for arguments on ``stdin``.
+
+    Arguments are read as a JSON list on a single line.  If ``stdin`` is
+    closed without arguments, exit without running the device UI.
+    '''
+    # Do not expose plugin modules (i.e., directory containing this script) as
+    # top-level modules to the device UI.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [p for p in sys.path
+                   if os.path.abspath(p or os.curdir) != script_dir]
+    __import__(module)
+    line = sys.stdin.readline()
+    if not line.strip():
+        return
+    sys.argv = [module] + json.loads(line)
+    runpy.run_module(module, run_name='__main__', alter_sys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else DEVICE_UI_MODULE)
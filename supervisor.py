@@ -0,0 +1,267 @@
+'''
+Supervise device UI process and restart it when it exits.
+
+.. versionadded:: 2.12
+'''
+from collections import deque
+import logging
+import threading
+import time
+import weakref
+
+import gobject
+
+logger = logging.getLogger(__name__)
+
+#: Process exited with code 0 (e.g., device UI window was closed).
+EXIT_CLEAN = 'clean'
+#: Process exited with non-zero exit code.
+EXIT_CRASH = 'crash'
+#: Process was terminated by a signal (POSIX only).
+EXIT_SIGNAL = 'signal'
+#: Process stopped responding and was killed.
+EXIT_HANG = 'hang'
+
+
+def classify_exit(returncode, hung=False):
+    '''
+    Parameters
+    ----------
+    returncode : int
+        Process exit code.
+    hung : bool, optional
+        ``True`` if process was killed because it stopped responding.
+
+    Returns
+    -------
+    str
+        One of :data:`EXIT_CLEAN`, :data:`EXIT_CRASH`, :data:`EXIT_SIGNAL`, or
+        :data:`EXIT_HANG`.
+    '''
+    if hung:
+        return EXIT_HANG
+    elif returncode == 0:
+        return EXIT_CLEAN
+    elif returncode < 0:
+        return EXIT_SIGNAL
+    return EXIT_CRASH
+
+
+class ProcessSupervisor(object):
+    '''
+    Restart a process as soon as it exits.
+
+    Each supervised process is waited on in a background thread, so exit is
+    detected immediately instead of by periodic polling.  Exit notifications
+    are handled in the GTK main loop.
+
+    A clean exit of a process that was ready (see :meth:`notify_ready`) is
+    restarted immediately.  Any other exit (including any exit before the
+    process was ready) is a failure, restarted after an exponential backoff
+    delay.  If :attr:`crash_loop_count` failures occur within
+    :attr:`crash_loop_window_s`, the process is considered to be in a crash
+    loop and is no longer restarted.
+
+    Python 2 :class:`subprocess.Popen` objects are not thread-safe, so once a
+    process is supervised, other threads must check whether it is running
+    using :meth:`poll` rather than :meth:`subprocess.Popen.poll` (which may
+    reap the process before the supervisor, and lose its exit code).
+
+    Parameters
+    ----------
+    restart : callable
+        Called (in the GTK main loop) to restart the process.
+    kill : callable
+        Called with a process to kill it, e.g., after it stopped responding.
+        Must not wait for (i.e., reap) the process, so its exit code is
+        recorded by the supervisor.
+    exited : callable, optional
+        Called (in the GTK main loop) with process and exit class when
+        supervised process exits.
+    backoff_s : float, optional
+        Restart delay after first failure (in seconds).
+    max_backoff_s : float, optional
+        Maximum restart delay (in seconds).
+    crash_loop_count : int, optional
+        Number of failures within :attr:`crash_loop_window_s` that indicate a
+        crash loop.
+    crash_loop_window_s : float, optional
+        Window (in seconds) for crash loop detection.
+    '''
+    def __init__(self, restart, kill, exited=None, backoff_s=1.,
+                 max_backoff_s=30., crash_loop_count=5,
+                 crash_loop_window_s=60.):
+        self.restart = restart
+        self.kill = kill
+        self.exited = exited
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.crash_loop_count = crash_loop_count
+        self.crash_loop_window_s = crash_loop_window_s
+        self.process = None
+        self.crash_loop = False
+        self.restart_count = 0
+        self.exit_counts = dict((k, 0) for k in (EXIT_CLEAN, EXIT_CRASH,
+                                                 EXIT_SIGNAL, EXIT_HANG))
+        self.last_exit = None
+        self.downtime_s = 0.
+        self._consecutive_failures = 0
+        self._failure_times = deque(maxlen=crash_loop_count)
+        self._down_since = None
+        self._hung = set()
+        self._restart_id = None
+        # `True` once supervised process is ready.
+        self._ready = False
+        # Exit code of each process waited on (`None` while running).
+        self._returncodes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def watch(self, process):
+        '''
+        Start supervising process.
+
+        Any previously supervised process is no longer supervised.
+        '''
+        self.process = process
+        self._ready = False
+        with self._lock:
+            self._returncodes[process] = None
+        thread = threading.Thread(target=self._wait, args=(process, ))
+        thread.daemon = True
+        thread.start()
+
+    def unwatch(self):
+        '''
+        Stop supervising process (e.g., before intentionally killing it) and
+        cancel any pending restart.
+        '''
+        self.process = None
+        if self._restart_id is not None:
+            gobject.source_remove(self._restart_id)
+            self._restart_id = None
+
+    def notify_ready(self):
+        '''
+        Record that supervised process is ready (ends any downtime period).
+        '''
+        self._ready = True
+        if self._down_since is not None:
+            self.downtime_s += time.time() - self._down_since
+            self._down_since = None
+
+    def report_hang(self, process=None):
+        '''
+        Kill process that stopped responding.
+
+        The resulting exit is classified as :data:`EXIT_HANG`.
+        '''
+        process = process or self.process
+        if process is None or self.poll(process) is not None:
+            return
+        logger.warning('Device UI process `%s` is not responding; kill it.',
+                       process.pid)
+        self._hung.add(process.pid)
+        try:
+            self.kill(process)
+        except Exception:
+            logger.debug('Error killing process `%s`', process.pid,
+                         exc_info=True)
+
+    def poll(self, process):
+        '''
+        Parameters
+        ----------
+        process : subprocess.Popen
+            Process (supervised now or before, or never supervised).
+
+        Returns
+        -------
+        int or None
+            Exit code of process, or ``None`` if process is running.
+        '''
+        with self._lock:
+            if process in self._returncodes:
+                return self._returncodes[process]
+        return process.poll()
+
+    def reset(self):
+        '''
+        Clear crash loop state (e.g., after user re-enables plugin).
+        '''
+        self.crash_loop = False
+        self._consecutive_failures = 0
+        self._failure_times.clear()
+
+    def stats(self):
+        '''
+        Returns
+        -------
+        dict
+            Supervisor statistics, including restart count, exit counts by
+            exit class, and accumulated downtime (in seconds).
+        '''
+        downtime_s = self.downtime_s
+        if self._down_since is not None:
+            downtime_s += time.time() - self._down_since
+        return {'restart_count': self.restart_count,
+                'exit_counts': dict(self.exit_counts),
+                'last_exit': self.last_exit,
+                'crash_loop': self.crash_loop,
+                'downtime_s': downtime_s}
+
+    def _wait(self, process):
+        # Only this thread waits on (i.e., reaps) the process.
+        returncode = process.wait()
+        with self._lock:
+            self._returncodes[process] = returncode
+        gobject.idle_add(self._on_exit, process, returncode)
+
+    def _on_exit(self, process, returncode):
+        if process is not self.process:
+            # Process is no longer supervised.
+            return False
+        self.process = None
+        exit_class = classify_exit(returncode, process.pid in self._hung)
+        self._hung.discard(process.pid)
+        now = time.time()
+        self._down_since = now
+        self.exit_counts[exit_class] += 1
+        self.last_exit = {'pid': process.pid, 'returncode': returncode,
+                          'class': exit_class, 'time': now}
+        if self.exited is not None:
+            self.exited(process, exit_class)
+
+        if exit_class == EXIT_CLEAN and self._ready:
+            self._consecutive_failures = 0
+            delay_s = 0
+        else:
+            if exit_class == EXIT_CLEAN:
+                logger.warning('Device UI process `%s` exited before it was '
+                               'ready.', process.pid)
+            if (self._failure_times and now - self._failure_times[-1] >
+                    self.crash_loop_window_s):
+                # Last failure was a while ago; start over with short delay.
+                self._consecutive_failures = 0
+            self._consecutive_failures += 1
+            self._failure_times.append(now)
+            if (len(self._failure_times) >= self.crash_loop_count and
+                    now - self._failure_times[0] < self.crash_loop_window_s):
+                self.crash_loop = True
+                logger.error('Device UI process failed %d times within %ss; '
+                             'not restarting.', len(self._failure_times),
+                             self.crash_loop_window_s)
+                return False
+            delay_s = min(self.backoff_s * 2 **
+                          (self._consecutive_failures - 1),
+                          self.max_backoff_s)
+        logger.info('Device UI process `%s` exited (%s, code %s); restart in '
+                    '%ss.', process.pid, exit_class, returncode, delay_s)
+        self._restart_id = gobject.timeout_add(int(delay_s * 1000),
+                                               self._restart)
+        return False
+
+    def _restart(self):
+        self._restart_id = None
+        self.restart_count += 1
+        self.restart()
+        return False
@@ -0,0 +1,18 @@
+'''
+Import plugin modules without importing the plugin package ``__init__``
+(which requires a MicroDrop environment), using the headless benchmark
+stand-ins for the GTK main loop (see ``benchmarks/standins``).
+'''
+import os
+import sys
+import types
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = 'dmf_device_ui_plugin'
+
+sys.path.insert(0, os.path.join(PLUGIN_DIR, 'benchmarks', 'standins'))
+
+if PACKAGE_NAME not in sys.modules:
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [PLUGIN_DIR]
+    sys.modules[PACKAGE_NAME] = package
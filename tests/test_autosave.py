@@ -0,0 +1,86 @@
+from dmf_device_ui_plugin.autosave import AutoSaver
+
+
+def make_saver(state, fields, **kwargs):
+    '''
+    Auto-saver capturing items of ``state`` whose key starts with field name.
+    '''
+    captured = []
+    persisted = []
+
+    def capture(field):
+        captured.append(field)
+        return dict([(k, v) for k, v in state.items() if k.startswith(field)])
+
+    saver = AutoSaver(capture, persisted.append, state, fields, **kwargs)
+    return saver, captured, persisted
+
+
+def test_fields_in_turn():
+    state = {'a': 1, 'b': 2}
+    saver, captured, persisted = make_saver(state, ['a', 'b'])
+    for i in range(4):
+        saver.tick()
+    assert captured == ['a', 'b', 'a', 'b']
+    assert persisted == []
+
+
+def test_debounce_dirty_field():
+    state = {'a': 1, 'b': 2}
+    saver, captured, persisted = make_saver(state, ['a', 'b'])
+    state['a'] = 3
+    saver.tick()
+    assert persisted == []
+    # Dirty field is captured again (instead of next field in turn), and
+    # persisted once unchanged.
+    saver.tick()
+    assert captured == ['a', 'a']
+    assert persisted == [{'a': 3}]
+    saver.tick()
+    assert captured == ['a', 'a', 'b']
+    assert persisted == [{'a': 3}]
+
+
+def test_max_pending():
+    state = {'a': 0}
+    saver, captured, persisted = make_saver(state, ['a'], max_pending=2)
+    for i in range(1, 4):
+        # Changes on every capture (e.g., while dragging corners).
+        state['a'] = i
+        saver.tick()
+    assert persisted == [{'a': 3}]
+
+
+def test_changed_back():
+    state = {'a': 1}
+    saver, captured, persisted = make_saver(state, ['a'])
+    state['a'] = 2
+    saver.tick()
+    state['a'] = 1
+    saver.tick()
+    saver.tick()
+    saver.flush()
+    assert persisted == []
+
+
+def test_capture_not_ready():
+    persisted = []
+    saver = AutoSaver(lambda field: None, persisted.append, {'a': 1}, ['a'])
+    saver.tick()
+    saver.flush()
+    assert persisted == []
+
+
+def test_flush_and_mark_persisted():
+    state = {'a': 1, 'ab': 2}
+    saver, captured, persisted = make_saver(state, ['a'])
+    state.update(a=3, ab=4)
+    saver.tick()
+    saver.mark_persisted({'ab': 4})
+    flushed = []
+    saver.flush(persist=flushed.append)
+    assert persisted == [] and flushed == [{'a': 3}]
+    # Nothing pending after flush.
+    saver.flush(persist=flushed.append)
+    saver.tick()
+    assert flushed == [{'a': 3}] and persisted == []
@@ -0,0 +1,63 @@
+import threading
+
+import gobject
+
+from dmf_device_ui_plugin.background import (CoalescedWriter, SerialWorker,
+                                             wait_event)
+
+
+def test_coalesced_writes():
+    writes = []
+    writer = CoalescedWriter(writes.append, delay_s=.01)
+    writer.update({'a': 1, 'b': 2})
+    writer.update({'a': 3})
+    assert writer.pending() == {'a': 3, 'b': 2}
+    assert writes == []
+    # Pending values are written by the main loop.
+    assert gobject.run_until(lambda: writes, 5)
+    assert writes == [{'a': 3, 'b': 2}]
+    assert writer.pending() == {}
+    assert writer.writes == 1
+
+
+def test_flush():
+    writes = []
+    writer = CoalescedWriter(writes.append, delay_s=60)
+    writer.flush()
+    assert writes == []
+    writer.update({'a': 1})
+    writer.flush()
+    assert writes == [{'a': 1}]
+    # Scheduled write was cancelled.
+    gobject.run_until(lambda: False, .05)
+    assert writes == [{'a': 1}]
+
+
+def test_pending_during_write():
+    # Values being written are still reported as pending (e.g., when read
+    # by `write` itself), and reading them does not block.
+    pending = []
+    writer = CoalescedWriter(lambda values: pending.append(writer.pending()))
+    writer.update({'a': 1})
+    writer.flush()
+    assert pending == [{'a': 1}]
+
+
+def test_serial_worker():
+    worker = SerialWorker()
+    # Thread is started on first call.
+    assert worker._thread is None
+    order = []
+    futures = [worker.submit(order.append, i) for i in range(5)]
+    assert all(future.wait(5) for future in futures)
+    assert order == list(range(5))
+    future = worker.submit(lambda: 1 / 0)
+    assert future.wait(5)
+    assert isinstance(future.exception(), ZeroDivisionError)
+
+
+def test_wait_event():
+    event = threading.Event()
+    assert not wait_event(event, .01)
+    threading.Timer(.01, event.set).start()
+    assert wait_event(event, 5)
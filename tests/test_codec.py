@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+import pytest
+
+from dmf_device_ui_plugin import codec
+
+
+def test_frame_round_trip():
+    data = codec.pack_frame([[0, 1.5], [2, 3]], ['a', 'b'], ['x', 'y'],
+                            index_name='i')
+    kind, labels, values = codec.unpack(data)
+    assert kind == codec.KIND_FRAME
+    assert labels == {'index': ['a', 'b'], 'index_name': 'i',
+                      'columns': ['x', 'y']}
+    assert values == [[0., 1.5], [2., 3.]]
+
+
+def test_series_round_trip():
+    kind, labels, values = codec.unpack(codec.pack_series([1, .5],
+                                                          ['a', 'b']))
+    assert kind == codec.KIND_SERIES
+    assert labels == {'index': ['a', 'b'], 'name': None}
+    assert values == [1., .5]
+
+
+def test_json_round_trip():
+    text = '{"b":1,"a":"c"}'
+    kind, labels, values = codec.unpack(codec.pack_json(text))
+    assert kind == codec.KIND_JSON
+    # Order of entries is kept.
+    assert values == OrderedDict([('b', 1), ('a', 'c')])
+
+
+def test_none_round_trip():
+    assert codec.unpack(codec.pack_none()) == (codec.KIND_NONE, None, None)
+
+
+def test_unsupported_version():
+    data = codec.pack_none()
+    raw = bytearray(codec.base64.b64decode(data))
+    raw[2] = codec._VERSION + 1
+    with pytest.raises(ValueError):
+        codec.unpack(codec.base64.b64encode(bytes(raw)))
+
+
+def test_pandas_round_trip():
+    pd = pytest.importorskip('pandas')
+
+    df = pd.DataFrame([[0, 0], [640, 0], [640, 480], [0, 480]],
+                      columns=['x', 'y'], dtype=float)
+    decoded = codec.decode(codec.encode(df))
+    assert decoded.equals(df)
+
+    alphas = pd.Series([1., .5], index=['a', 'b'], name='alpha')
+    decoded = codec.decode(codec.encode(alphas))
+    assert decoded.equals(alphas) and decoded.name == 'alpha'
+
+    video_config = pd.Series(OrderedDict([('device_name', 'cam'),
+                                          ('width', 640)]))
+    decoded = codec.decode(codec.encode(video_config))
+    assert decoded.tolist() == video_config.tolist()
+    assert decoded.index.tolist() == video_config.index.tolist()
+
+    assert codec.decode(codec.encode(None)) is None
+    with pytest.raises(TypeError):
+        codec.encode(pd.DataFrame({'a': ['text']}))
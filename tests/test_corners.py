@@ -0,0 +1,74 @@
+import pytest
+
+from dmf_device_ui_plugin.corners import (PREFIX, corners_as_text,
+                                          migrate_corners, pack_corners,
+                                          parse_corners)
+
+POINTS = [(0., 0.), (640., 0.), (640., 480.), (0.5, 480.)]
+CSV = ',x,y\n0,0.0,0.0\n1,640.0,0.0\n2,640.0,480.0\n3,0.5,480.0\n'
+
+
+def test_pack_parse_round_trip():
+    text = pack_corners(POINTS)
+    assert text.startswith(PREFIX)
+    assert parse_corners(text) == POINTS
+
+
+def test_parse_csv():
+    assert parse_corners(CSV) == POINTS
+    # Windows line endings.
+    assert parse_corners(CSV.replace('\n', '\r\n')) == POINTS
+    # Blank lines (skipped, as by `pandas.read_csv`).
+    assert parse_corners('\n' + CSV.replace('\n', '\n\n')) == POINTS
+
+
+@pytest.mark.parametrize('text', [
+    # Named index.
+    'i,x,y\n0,0.0,0.0\n1,640.0,0.0\n2,640.0,480.0\n3,0.5,480.0\n',
+    # Index labels other than 0 to 3.
+    ',x,y\n1,0.0,0.0\n2,640.0,0.0\n3,640.0,480.0\n4,0.5,480.0\n',
+    ',x,y\na,0.0,0.0\nb,640.0,0.0\nc,640.0,480.0\nd,0.5,480.0\n',
+    # Other columns.
+    ',y,x\n0,0.0,0.0\n1,640.0,0.0\n2,640.0,480.0\n3,0.5,480.0\n',
+    ',x,y,z\n0,0.0,0.0,0\n1,640.0,0.0,0\n2,640.0,480.0,0\n3,0.5,480.0,0\n',
+    # Number of corners.
+    ',x,y\n0,0.0,0.0\n1,640.0,0.0\n2,640.0,480.0\n',
+    '',
+    '\n\n',
+    # Missing values.
+    ',x,y\n0,0.0\n1,640.0,0.0\n2,640.0,480.0\n3,0.5,480.0\n',
+    ',x,y\n0,0.0,\n1,640.0,0.0\n2,640.0,480.0\n3,0.5,480.0\n',
+    # Truncated compact encoding.
+    pack_corners(POINTS)[:-8]])
+def test_parse_unexpected_layout(text):
+    with pytest.raises(ValueError):
+        parse_corners(text)
+
+
+def test_migrate_corners():
+    custom = CSV.replace(',x,y', 'i,x,y')
+    compact = pack_corners(POINTS)
+    app_values = {'canvas_corners': CSV, 'frame_corners': custom,
+                  'video_config': ''}
+    migrated = migrate_corners(app_values)
+    # Only CSV with the default layout is migrated.
+    assert migrated == {'canvas_corners': compact}
+    assert parse_corners(migrated['canvas_corners']) == \
+        parse_corners(app_values['canvas_corners'])
+    assert migrate_corners({'canvas_corners': compact,
+                            'frame_corners': ''}) == {}
+
+
+def test_corners_as_text():
+    pd = pytest.importorskip('pandas')
+
+    df = pd.DataFrame(POINTS, columns=['x', 'y'])
+    assert corners_as_text(df) == pack_corners(POINTS)
+    # Frames without the layout of corners are stored as CSV.
+    df.index = [1, 2, 3, 4]
+    assert corners_as_text(df) == df.to_csv()
+    with pytest.raises(ValueError):
+        parse_corners(df.to_csv())
+    df.index = pd.Index(range(4), name='i')
+    with pytest.raises(ValueError):
+        parse_corners(corners_as_text(df))
@@ -0,0 +1,17 @@
+from dmf_device_ui_plugin.memo import LruCache
+
+
+def test_lru_eviction():
+    cache = LruCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    # Mark `a` as most recently used, so `b` is evicted.
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('b', 0) == 0
+    assert cache.get('c') == 3
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,49 @@
+from dmf_device_ui_plugin.metrics import CommandMetrics, LatencyHistogram
+
+
+def test_histogram():
+    histogram = LatencyHistogram(bounds_s=(.001, .01, .1))
+    assert histogram.percentile(50) is None
+    for duration_s in (.0005, .005, .005, .05):
+        histogram.record(duration_s)
+    histogram.record(1., 'timeout')
+    histogram.record(.002, 'error')
+    assert histogram.counts == [1, 3, 1, 1]
+    assert histogram.percentile(50) == .01
+    # Overflow bucket reports maximum duration.
+    assert histogram.percentile(100) == 1.
+    stats = histogram.as_dict()
+    assert stats['count'] == 6
+    assert stats['timeouts'] == 1 and stats['errors'] == 1
+    assert stats['min_s'] == .0005 and stats['max_s'] == 1.
+    assert stats['buckets'][-1] == {'le_s': None, 'count': 1}
+
+
+def test_command_metrics():
+    metrics = CommandMetrics(log_interval_s=None)
+    metrics.record('a', .1)
+    metrics.record('a', 1., 'timeout')
+    assert metrics.histogram('a').count == 2
+    assert metrics.histogram('a').timeouts == 1
+    assert metrics.histogram('b') is None
+    assert sorted(metrics.stats()) == ['a']
+
+
+def test_recent_percentile():
+    metrics = CommandMetrics(log_interval_s=None, window=4)
+    for duration_s in (.1, .2, .3):
+        metrics.record('a', duration_s)
+    assert metrics.recent_percentile('a', 50) is None
+    assert metrics.recent_percentile('a', 50, min_count=3) == .2
+    # Only the `window` most recent durations are kept.
+    for duration_s in (.01, .02, .03, .04):
+        metrics.record('a', duration_s)
+    assert metrics.recent_percentile('a', 100, min_count=4) == .04
+    # No percentile after a timeout, until the next successful call.
+    metrics.record('a', 1., 'timeout')
+    assert metrics.recent_percentile('a', 50, min_count=1) is None
+    metrics.record('a', .05)
+    assert metrics.recent_percentile('a', 100, min_count=1) == .05
+    assert metrics.histogram('a').count == 9
+    assert metrics.histogram('b') is None
+    assert sorted(metrics.stats()) == ['a']
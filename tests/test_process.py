@@ -0,0 +1,59 @@
+from subprocess import Popen
+import sys
+import time
+
+import pytest
+
+from dmf_device_ui_plugin.process import (NEW_PROCESS_GROUP_KWARGS,
+                                          kill_process_tree)
+
+psutil = pytest.importorskip('psutil')
+pytestmark = pytest.mark.skipif(sys.platform == 'win32',
+                                reason='Uses POSIX shell commands.')
+
+#: Parent process (group leader) that starts a child process.
+PARENT_ARGS = [sys.executable, '-c', 'import subprocess, time; '
+               'subprocess.Popen(["sleep", "30"]); time.sleep(30)']
+
+
+def start_tree():
+    process = Popen(PARENT_ARGS, **NEW_PROCESS_GROUP_KWARGS)
+    start = time.time()
+    while time.time() - start < 5:
+        children = psutil.Process(process.pid).children()
+        if children:
+            return process, children
+        time.sleep(.01)
+    process.kill()
+    raise RuntimeError('Child process did not start.')
+
+
+def exited(process):
+    # Killed children of a hung (or killed) parent may not be reaped.
+    try:
+        return process.status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+
+
+def test_kill_process_tree():
+    process, children = start_tree()
+    report = kill_process_tree(process.pid, timeout_s=5)
+    assert report.alive == []
+    assert (sorted(pid for pid, seconds in report.terminated + report.killed)
+            == sorted([process.pid] + [child.pid for child in children]))
+    assert all(exited(child) for child in children)
+
+
+def test_kill_children_only():
+    process, children = start_tree()
+    try:
+        report = kill_process_tree(process.pid, including_parent=False,
+                                   timeout_s=5)
+        assert report.alive == []
+        assert all(exited(child) for child in children)
+        # Parent is still running (and was not reaped).
+        assert process.poll() is None
+    finally:
+        process.kill()
+    assert process.wait() != 0
@@ -0,0 +1,48 @@
+import pytest
+
+from dmf_device_ui_plugin.profiles import ProfileStore
+
+
+def convert(settings):
+    return dict([(k, v.upper()) for k, v in settings.items()])
+
+
+def test_save_find_remove():
+    store = ProfileStore(convert)
+    store.save('chip-a', {'video_config': 'a', 'x': 10}, device_id='cam-1')
+    store.save('chip-b', {'video_config': 'b'}, device_id='cam-1')
+    assert store.names() == ['chip-a', 'chip-b']
+    # Only settings keys are stored.
+    assert store.json_settings('chip-a') == {'video_config': 'a'}
+    assert store.ui_settings('chip-a') == {'video_config': 'A'}
+    # Most recently saved profile for device.
+    assert store.find('cam-1') == 'chip-b'
+    store.remove('chip-b')
+    assert store.find('cam-1') is None
+    assert 'chip-b' not in store and len(store) == 1
+    with pytest.raises(KeyError):
+        store.remove('chip-b')
+
+
+def test_text_round_trip():
+    store = ProfileStore(convert)
+    store.save('chip-a', {'surface_alphas': 's'}, device_id='cam-1')
+    store.save('chip-b', {'video_config': 'b'})
+    loaded = ProfileStore(convert)
+    loaded.load(store.to_text())
+    assert loaded.get_profiles() == store.get_profiles()
+    assert loaded.ui_settings('chip-a') == {'surface_alphas': 'S'}
+    assert loaded.find('cam-1') == 'chip-a'
+    loaded.load('')
+    assert len(loaded) == 0 and loaded.to_text() == ''
+
+
+@pytest.mark.parametrize('text', ['[]', '{"a": "x"}', '{"a": {"settings": 1}}',
+                                  'not json'])
+def test_load_invalid(text):
+    store = ProfileStore(convert)
+    store.save('chip-a', {'video_config': 'a'})
+    with pytest.raises(ValueError):
+        store.load(text)
+    # Profiles are unchanged.
+    assert store.names() == ['chip-a']
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+
+from dmf_device_ui_plugin import rpc
+from dmf_device_ui_plugin.rpc import (CommandNotSupported, DeviceUiClient,
+                                      fingerprint)
+
+
+class FakeHub(object):
+    '''
+    Replies to each command with a value, or raises it if it is an exception.
+    '''
+    def __init__(self, **replies):
+        self.replies = replies
+        self.calls = []
+
+    def __call__(self, name, command, **kwargs):
+        self.calls.append((name, command, kwargs))
+        reply = self.replies[command]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = FakeHub()
+    monkeypatch.setattr(rpc, 'hub_execute', hub)
+    return hub
+
+
+def unrecognized(command):
+    return RuntimeError('NameError: Unrecognized command: %s' % command)
+
+
+def test_execute_metrics_keyed_by_target(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies.update(get_commands=['a'], get_video_config='v')
+    assert client.execute('get_commands', target='command_plugin') == ['a']
+    assert client.execute('get_video_config', timeout_s=1) == 'v'
+    assert [call[:2] for call in hub.calls] == \
+        [('command_plugin', 'get_commands'),
+         ('device_ui', 'get_video_config')]
+    assert sorted(client.metrics.stats()) == ['command_plugin.get_commands',
+                                              'get_video_config']
+
+
+def test_execute_optional_unrecognized(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies['get_ui_state'] = unrecognized('get_ui_state')
+    for i in range(2):
+        with pytest.raises(CommandNotSupported):
+            client.execute_optional('get_ui_state', timeout_s=1)
+    # Not sent again once known to be unsupported.
+    assert len(hub.calls) == 1
+    client.reset()
+    assert client.supports('get_ui_state')
+
+
+@pytest.mark.parametrize('error', [ValueError('Invalid settings.'),
+                                   IOError('Timed out.')])
+def test_execute_optional_error(hub, error):
+    client = DeviceUiClient('device_ui')
+    hub.replies['apply_ui_settings'] = error
+    with pytest.raises(type(error)):
+        client.execute_optional('apply_ui_settings', timeout_s=1)
+    # Only an unrecognized command is treated as unsupported.
+    assert client.supports('apply_ui_settings')
+
+
+def test_lock_wait_counts_against_timeout(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies['get_video_config'] = 'v'
+    client._lock.acquire()
+    start = time.time()
+    with pytest.raises(IOError):
+        client.execute('get_video_config', timeout_s=.05)
+    assert time.time() - start < 1
+    assert hub.calls == []
+    assert client.metrics.histogram('get_video_config').timeouts == 1
+
+    # Request is sent with the time remaining once lock is released.
+    threading.Timer(.05, client._lock.release).start()
+    assert client.execute('get_video_config', timeout_s=1) == 'v'
+    assert hub.calls[0][2]['timeout_s'] <= .95
+
+
+def test_deadline(hub):
+    client = DeviceUiClient('device_ui', deadline_floor_s=.1)
+    assert client.deadline('get_corners', 2) == 2
+    for i in range(8):
+        client.metrics.record('get_corners', .05)
+    assert client.deadline('get_corners', 2) == pytest.approx(.2)
+    assert client.deadline('get_corners', .15) == .15
+    # Ceiling is used again after a timeout.
+    client.metrics.record('get_corners', .15, 'timeout')
+    assert client.deadline('get_corners', 2) == 2
+
+
+def test_get_ui_state_without_wire_format(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies.update(get_wire_formats=unrecognized('get_wire_formats'),
+                       get_ui_state={'video_config': 'v', 'errors':
+                                     {'corners': 'No corners.'}})
+    state, errors = client.get_ui_state(timeout_s=1)
+    assert state == {'video_config': 'v'}
+    assert errors == {'corners': 'No corners.',
+                      'surface_alphas': 'Missing from response.'}
+    assert hub.calls[-1][2]['fields'] == list(rpc.UI_STATE_FIELDS)
+    assert 'encoding' not in hub.calls[-1][2]
+
+
+def test_get_ui_state_unsupported(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies.update(get_wire_formats=unrecognized('get_wire_formats'),
+                       get_ui_state=unrecognized('get_ui_state'))
+    with pytest.raises(CommandNotSupported):
+        client.get_ui_state(timeout_s=1)
+    # Wire format is not negotiated once batched command is unsupported.
+    del hub.calls[:]
+    with pytest.raises(CommandNotSupported):
+        client.get_ui_state(timeout_s=1)
+    assert hub.calls == []
+
+
+def test_wire_format_retry_after_timeout(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies['get_wire_formats'] = IOError('Timed out.')
+    assert client.wire_format() is None
+    assert client.wire_format() is None
+    # Not negotiated again until retry delay has passed.
+    assert len(hub.calls) == 1
+    client._wire_format_retry_at = 0
+    hub.replies['get_wire_formats'] = []
+    assert client.wire_format() is None
+    assert len(hub.calls) == 2
+    assert client.wire_format() is None
+    assert len(hub.calls) == 2
+
+
+def test_apply_ui_settings(hub):
+    client = DeviceUiClient('device_ui')
+    hub.replies.update(get_wire_formats=[], apply_ui_settings=None)
+    client.apply_ui_settings({'video_config': 'v', 'df_canvas_corners': 'c',
+                              'df_frame_corners': 'f', 'other': 'o'},
+                             default_corners=True, timeout_s=1)
+    kwargs = hub.calls[-1][2]
+    # Only settings known to `apply_ui_settings` are sent.
+    assert kwargs['settings'] == {'video_config': 'v',
+                                  'df_canvas_corners': 'c',
+                                  'df_frame_corners': 'f'}
+    assert kwargs['default_corners']
+
+
+def test_fingerprint():
+    assert fingerprint('a', 'b') == fingerprint(u'a', u'b')
+    # Values are delimited.
+    assert fingerprint('a', 'b') != fingerprint('ab', '')
+    assert fingerprint(None) == fingerprint('')
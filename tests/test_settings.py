@@ -0,0 +1,44 @@
+import pytest
+
+from dmf_device_ui_plugin import codec
+from dmf_device_ui_plugin.corners import pack_corners
+from dmf_device_ui_plugin.settings import (Corners, SurfaceAlphas,
+                                           VideoConfig, as_text, from_wire)
+
+POINTS = [(0., 0.), (640., 0.), (640., 480.), (0., 480.)]
+
+
+def test_text_round_trip():
+    video_config = VideoConfig.from_text('{"device_name":"cam","width":640}')
+    assert video_config.items == (('device_name', 'cam'), ('width', 640))
+    assert VideoConfig.from_text(video_config.to_text()) == video_config
+    assert VideoConfig.from_text('') == VideoConfig()
+    assert VideoConfig().to_text() == ''
+
+    corners = Corners.from_text(pack_corners(POINTS))
+    assert corners.points == tuple(POINTS)
+    assert Corners.from_text(corners.to_text()) == corners
+
+
+def test_wire_round_trip():
+    alphas = SurfaceAlphas([('a', 1), ('b', .5)])
+    assert from_wire('surface_alphas', alphas.to_wire()) == alphas
+    video_config = VideoConfig([('device_name', 'cam'), ('width', 640)])
+    assert from_wire('video_config', video_config.to_wire()) == video_config
+    corners = Corners(POINTS)
+    assert from_wire('corners', corners.to_wire()) == corners
+    assert from_wire('video_config', codec.pack_none()) is None
+
+
+def test_as_text_pandas():
+    pd = pytest.importorskip('pandas')
+
+    # Object-dtype series (e.g., row of mixed data frame) holds numpy
+    # scalars.
+    row = pd.DataFrame({'device_name': ['cam'], 'width': [640],
+                        'flipped': [True]})[['device_name', 'width',
+                                             'flipped']].iloc[0]
+    assert as_text(row) == '{"device_name":"cam","width":640,"flipped":true}'
+    assert as_text(pd.Series([1., .5], index=['a', 'b'])) == \
+        SurfaceAlphas([('a', 1.), ('b', .5)]).to_text()
+    assert as_text(None) == ''
@@ -0,0 +1,117 @@
+from subprocess import Popen
+import sys
+import threading
+
+import pytest
+
+gobject = pytest.importorskip('gobject')
+if not hasattr(gobject, 'run_until'):
+    pytest.skip('Requires headless `gobject` main loop stand-in.',
+                allow_module_level=True)
+
+from dmf_device_ui_plugin.supervisor import (EXIT_CLEAN, EXIT_CRASH,
+                                             EXIT_HANG, EXIT_SIGNAL,
+                                             ProcessSupervisor,
+                                             classify_exit)
+
+
+class FakeProcess(object):
+    def __init__(self, pid, returncode, running=False):
+        self.pid = pid
+        self.returncode = returncode
+        self.exited = threading.Event()
+        if not running:
+            self.exited.set()
+
+    def wait(self):
+        self.exited.wait()
+        return self.returncode
+
+    def poll(self):
+        raise AssertionError('Supervised process must not be polled.')
+
+
+def exit_process(supervisor, returncode, ready=True, pid=[100]):
+    '''
+    Returns
+    -------
+    float or None
+        Delay of scheduled restart (``None`` if restart is not scheduled).
+    '''
+    pid[0] += 1
+    process = FakeProcess(pid[0], returncode)
+    supervisor.watch(process)
+    if ready:
+        supervisor.notify_ready()
+    assert gobject.run_until(lambda: supervisor.process is None, 5)
+    assert supervisor.poll(process) == returncode
+    if supervisor._restart_id is None:
+        return None
+    # Cancel scheduled restart.
+    delay_s = gobject._sources[supervisor._restart_id][1]
+    supervisor.unwatch()
+    return delay_s
+
+
+def test_classify_exit():
+    assert classify_exit(0) == EXIT_CLEAN
+    assert classify_exit(3) == EXIT_CRASH
+    assert classify_exit(-9) == EXIT_SIGNAL
+    assert classify_exit(-9, hung=True) == EXIT_HANG
+
+
+def test_backoff():
+    supervisor = ProcessSupervisor(restart=None, kill=None, backoff_s=1.,
+                                   max_backoff_s=4., crash_loop_count=10)
+    delays_s = [exit_process(supervisor, 3) for i in range(4)]
+    # Clean exit of ready process is restarted immediately and resets
+    # backoff.
+    delays_s.append(exit_process(supervisor, 0))
+    delays_s.append(exit_process(supervisor, 3))
+    assert delays_s == [1., 2., 4., 4., 0, 1.]
+    assert supervisor.exit_counts[EXIT_CRASH] == 5
+    assert supervisor.exit_counts[EXIT_CLEAN] == 1
+
+
+def test_clean_exit_before_ready_is_failure():
+    supervisor = ProcessSupervisor(restart=None, kill=None, backoff_s=1.,
+                                   crash_loop_count=3)
+    assert [exit_process(supervisor, 0, ready=False)
+            for i in range(2)] == [1., 2.]
+    assert not supervisor.crash_loop
+    # Crash loop; not restarted.
+    assert exit_process(supervisor, 0, ready=False) is None
+    assert supervisor.crash_loop
+
+    supervisor.reset()
+    assert exit_process(supervisor, 3) == 1.
+    assert not supervisor.crash_loop
+
+
+def test_hang():
+    supervisor = ProcessSupervisor(restart=None, kill=lambda process:
+                                   process.exited.set())
+    process = FakeProcess(1, -9, running=True)
+    supervisor.watch(process)
+    supervisor.notify_ready()
+    assert supervisor.poll(process) is None
+    supervisor.report_hang()
+    assert gobject.run_until(lambda: supervisor.process is None, 5)
+    assert supervisor.last_exit['class'] == EXIT_HANG
+    supervisor.unwatch()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX exit codes')
+def test_hang_exit_code():
+    # Process is killed without being reaped, so its exit code is recorded.
+    supervisor = ProcessSupervisor(restart=None, kill=lambda process:
+                                   process.kill())
+    process = Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    supervisor.watch(process)
+    supervisor.notify_ready()
+    supervisor.report_hang()
+    assert gobject.run_until(lambda: supervisor.process is None, 5)
+    assert supervisor.last_exit['class'] == EXIT_HANG
+    assert supervisor.last_exit['returncode'] == -9
+    assert supervisor.poll(process) == -9
+    supervisor.unwatch()
@@ -0,0 +1,37 @@
+import threading
+
+from dmf_device_ui_plugin.video_toggle import VideoToggler
+
+
+def test_superseded_toggles():
+    sent = []
+    blocked = threading.Event()
+
+    def execute(command, timeout_s=None):
+        blocked.wait(5)
+        sent.append(command)
+
+    toggler = VideoToggler(execute)
+    futures = [toggler.submit(command) for command in
+               ('enable_video', 'disable_video', 'enable_video')]
+    blocked.set()
+    assert [future.result(5) for future in futures][1:] == [False, True]
+    # Only the first toggle (already being sent) and the most recent toggle
+    # are sent.
+    assert sent[-1] == 'enable_video'
+    stats = toggler.stats()
+    assert stats['queued'] == 3
+    assert stats['sent'] + stats['superseded'] == 3
+    assert stats['failed'] == 0
+
+
+def test_failed_toggle():
+    def execute(command, timeout_s=None):
+        raise IOError('Timed out.')
+
+    toggler = VideoToggler(execute)
+    future = toggler.submit('disable_video')
+    assert future.wait(5)
+    assert isinstance(future.exception(), IOError)
+    assert toggler.stats()['failed'] == 1
+    assert toggler.stats()['errors'] == [('disable_video', 'Timed out.')]
@@ -0,0 +1,70 @@
+'''
+Record timeline of device UI process start up phases.
+
+.. versionadded:: 2.12
+'''
+import sys
+import time
+
+try:
+    from time import monotonic
+except ImportError:
+    try:
+        # Backport of `time.monotonic` for Python 2.
+        from monotonic import monotonic
+    except ImportError:
+        # `time.clock` is a monotonic wall clock on Windows (but not on POSIX).
+        monotonic = time.clock if sys.platform == 'win32' else time.time
+
+
+class StartupTimeline(object):
+    '''
+    Offsets (in seconds, using a monotonic clock) of each phase of a device UI
+    process start up, relative to when start up was requested.
+
+    Parameters
+    ----------
+    kind : str, optional
+        Start up kind (e.g., ``'start'`` or ``'restart'``).
+    '''
+    def __init__(self, kind='start'):
+        self.kind = kind
+        self.pid = None
+        self.timestamp = time.time()
+        self.phases = []
+        self.finished = False
+        self.error = None
+        self._start = monotonic()
+
+    def mark(self, phase):
+        '''
+        Record that a start up phase completed.
+        '''
+        if not self.finished:
+            self.phases.append((phase, monotonic() - self._start))
+
+    def finish(self, error=None):
+        '''
+        Mark start up as finished (optionally, with an error message).
+        '''
+        self.mark('finished' if error is None else 'failed')
+        self.error = error
+        self.finished = True
+
+    @property
+    def duration_s(self):
+        return self.phases[-1][1] if self.phases else 0.
+
+    def as_dict(self):
+        '''
+        Returns
+        -------
+        dict
+            JSON-compatible timeline, including ``phases`` as a list of
+            ``{'phase': ..., 'offset_s': ...}`` entries in order.
+        '''
+        return {'kind': self.kind, 'pid': self.pid,
+                'timestamp': self.timestamp, 'duration_s': self.duration_s,
+                'error': self.error,
+                'phases': [{'phase': phase, 'offset_s': offset_s}
+                           for phase, offset_s in self.phases]}
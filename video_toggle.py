@@ -0,0 +1,120 @@
+'''
+Send per-step video toggles to device UI without blocking protocol steps.
+
+.. versionadded:: 2.12
+'''
+from collections import deque
+import itertools
+import logging
+import threading
+
+from .background import SerialWorker
+from .timeline import monotonic
+
+logger = logging.getLogger(__name__)
+
+
+class VideoToggler(object):
+    '''
+    Send video toggle commands (i.e., ``enable_video``/``disable_video``) in
+    order, in a background thread.
+
+    If several toggles are queued, only the most recent is sent, since each
+    toggle replaces the video state set by earlier toggles.
+
+    Parameters
+    ----------
+    execute : function
+        Called as ``execute(command)`` to send command to device UI.
+    late_s : float, optional
+        Toggles sent more than ``late_s`` seconds after being queued are
+        counted (and logged) as late.
+    max_errors : int, optional
+        Number of most recent errors to keep.
+    '''
+    def __init__(self, execute, late_s=.5, max_errors=20):
+        self.execute = execute
+        self.late_s = late_s
+        #: Most recent errors, as ``(command, error message)`` tuples.
+        self.errors = deque(maxlen=max_errors)
+        self._worker = SerialWorker(name='dmf_device_ui_video')
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._latest_id = None
+        self._stats = dict.fromkeys(['queued', 'sent', 'superseded', 'late',
+                                     'failed'], 0)
+        self._stats.update(total_latency_s=0., max_latency_s=0.)
+
+    def submit(self, command):
+        '''
+        Queue video toggle command.
+
+        Returns
+        -------
+        Future
+            Result is ``True`` if command was sent, or ``False`` if it was
+            superseded by a more recent toggle.
+        '''
+        with self._lock:
+            toggle_id = next(self._ids)
+            self._latest_id = toggle_id
+            self._stats['queued'] += 1
+        return self._worker.submit(self._send, toggle_id, command,
+                                   monotonic())
+
+    def _send(self, toggle_id, command, queued_at):
+        with self._lock:
+            if toggle_id != self._latest_id:
+                self._stats['superseded'] += 1
+                return False
+        try:
+            self.execute(command)
+        except Exception as exception:
+            with self._lock:
+                self._stats['failed'] += 1
+                self.errors.append((command, str(exception)))
+            logger.warning('Error sending `%s` to device UI: %s', command,
+                           exception)
+            raise
+        latency_s = monotonic() - queued_at
+        with self._lock:
+            self._stats['sent'] += 1
+            self._stats['total_latency_s'] += latency_s
+            self._stats['max_latency_s'] = max(self._stats['max_latency_s'],
+                                               latency_s)
+            if latency_s > self.late_s:
+                self._stats['late'] += 1
+                late = True
+            else:
+                late = False
+        if late:
+            logger.warning('`%s` reached device UI %.2f s after step '
+                           'started.', command, latency_s)
+        return True
+
+    def pending(self):
+        '''
+        Returns
+        -------
+        int
+            Approximate number of queued toggles not yet started.
+        '''
+        return self._worker.pending()
+
+    def stats(self):
+        '''
+        Returns
+        -------
+        dict
+            Toggle counts (i.e., ``queued``, ``sent``, ``superseded``,
+            ``late``, ``failed``), latency between queueing and completion
+            of sent toggles (``mean_latency_s``, ``max_latency_s``), and most
+            recent ``errors``.
+        '''
+        with self._lock:
+            stats = dict(self._stats)
+            stats['errors'] = list(self.errors)
+        total_latency_s = stats.pop('total_latency_s')
+        stats['mean_latency_s'] = (total_latency_s / stats['sent']
+                                   if stats['sent'] else None)
+        return stats